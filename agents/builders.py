@@ -5,6 +5,7 @@ This module contains functions to build LangChain v1 agents with structured outp
 for each specialized role in the fashion trend analysis pipeline.
 """
 
+import asyncio
 import traceback
 from langchain.agents import create_agent
 from langchain.agents.structured_output import ProviderStrategy, ToolStrategy
@@ -35,6 +36,15 @@ from fashion_agent.tools.mcp_clients import (
 )
 
 
+# Structured-output strategies are built once: ToolStrategy derives each model's
+# JSON schema when constructed, and agents are rebuilt on every node attempt
+_DATA_COLLECTOR_FORMAT = ToolStrategy(DataCollectorOutput)
+_CONTENT_ANALYZER_FORMAT = ToolStrategy(ContentAnalysisOutput)
+_VIDEO_ANALYZER_FORMAT = ToolStrategy(VideoTrendOutput)
+_FINAL_PROCESSOR_FORMAT = ToolStrategy(TrendAnalysisList)
+_OUTFIT_DESIGNER_FORMAT = ToolStrategy(ListofOutfits)
+
+
 # =========================
 # Agent 1: Data Collector
 # =========================
@@ -45,11 +55,9 @@ async def build_agent1_modern():
         file_logger.info("Building data collector agent...")
         
         # Get MCP tools directly - no @task needed for async operations
-        scraper_tools = await get_scraper_tools()
+        # Scraper and Tavily (web search, optional) servers are queried concurrently
+        scraper_tools, tavily_tools = await asyncio.gather(get_scraper_tools(), get_tavily_tools())
         file_logger.info(f"Retrieved {len(scraper_tools)} scraper tools")
-        
-        # Get Tavily tools for web search (optional)
-        tavily_tools = await get_tavily_tools()
         file_logger.info(f"Retrieved {len(tavily_tools)} Tavily tools")
         
         # Combine all tools
@@ -61,7 +69,7 @@ async def build_agent1_modern():
             model=llm,
             tools=tools,
             system_prompt=get_data_collector_prompt(),
-            response_format=ToolStrategy(DataCollectorOutput)  # Use ToolStrategy for reliability
+            response_format=_DATA_COLLECTOR_FORMAT  # Use ToolStrategy for reliability
         )
         file_logger.info("SUCCESS: Data collector agent built successfully")
         return agent
@@ -74,7 +82,7 @@ async def build_agent1_modern():
             model=llm,
             tools=[],
             system_prompt=get_data_collector_prompt(),
-            response_format=ToolStrategy(DataCollectorOutput)  # Use ToolStrategy for reliability
+            response_format=_DATA_COLLECTOR_FORMAT  # Use ToolStrategy for reliability
         )
         return agent
 
@@ -89,11 +97,9 @@ async def build_agent2_modern():
         file_logger.info("Building content analyzer agent...")
         
         # Get MCP tools directly - no @task needed for async operations
-        image_tools = await get_image_tools()
+        # Image and Tavily (URL content extraction, optional) servers are queried concurrently
+        image_tools, tavily_tools = await asyncio.gather(get_image_tools(), get_tavily_tools())
         file_logger.info(f"Retrieved {len(image_tools)} image tools")
-        
-        # Get Tavily tools for URL content extraction (optional)
-        tavily_tools = await get_tavily_tools()
         file_logger.info(f"Retrieved {len(tavily_tools)} Tavily tools")
         
         # Combine all tools
@@ -104,7 +110,7 @@ async def build_agent2_modern():
             model=llm,
             tools=tools,
             system_prompt=get_content_analyzer_prompt(),
-            response_format=ToolStrategy(ContentAnalysisOutput)  # Use ToolStrategy for reliability
+            response_format=_CONTENT_ANALYZER_FORMAT  # Use ToolStrategy for reliability
         )
         file_logger.info("SUCCESS: Content analyzer agent built successfully")
         return agent
@@ -131,7 +137,7 @@ async def build_agent3_modern():
             model=llm,
             tools=tools,
             system_prompt=get_video_analyzer_prompt(),
-            response_format=ToolStrategy(VideoTrendOutput)  # Use ToolStrategy for reliability
+            response_format=_VIDEO_ANALYZER_FORMAT  # Use ToolStrategy for reliability
         )
         file_logger.info("SUCCESS: Video analyzer agent built successfully")
         return agent
@@ -165,7 +171,7 @@ async def build_agent4_modern():
             model=llm,
             tools=tools,
             system_prompt=get_final_processor_prompt(),
-            response_format=ToolStrategy(TrendAnalysisList)  # Use ToolStrategy for reliability
+            response_format=_FINAL_PROCESSOR_FORMAT  # Use ToolStrategy for reliability
         )
         file_logger.info("SUCCESS: Final processor agent built successfully")
         return agent
@@ -201,7 +207,7 @@ async def build_agent5_modern():
             model=llm,
             tools=tools,
             system_prompt=get_outfit_designer_prompt(),
-            response_format=ToolStrategy(ListofOutfits)  # Use ToolStrategy for reliability
+            response_format=_OUTFIT_DESIGNER_FORMAT  # Use ToolStrategy for reliability
         )
         console_logger.info("SUCCESS: Outfit designer agent built successfully")
         return agent
@@ -515,6 +515,22 @@ MAX_RETRIES = 3
 BASE_DELAY = 22  # seconds
 
 
+# =========================
+# Video Generation Configuration
+# =========================
+
+# Max make_video calls in flight at once; the Veo backend rejects bursts with 429s
+VIDEO_GEN_CONCURRENCY = config('VIDEO_GEN_CONCURRENCY', default=4, cast=int)
+VIDEO_GEN_TIMEOUT = 600  # seconds per outfit video
+VIDEO_GEN_BUDGET = config('VIDEO_GEN_BUDGET', default=1800, cast=int)  # seconds for the whole batch
+
+# Base directory prepended to relative outfit image paths
+OUTFIT_IMAGE_BASE_DIR = config('OUTFIT_IMAGE_BASE_DIR', default='D:/Downloads/FashionUseCase/scraapper/')
+
+# Worker threads reserved for blocking Supabase/DB calls made from the video generator
+STORAGE_THREAD_POOL_SIZE = config('STORAGE_THREAD_POOL_SIZE', default=16, cast=int)
+
+
 # =========================
 # Exports
 # =========================
@@ -532,6 +548,11 @@ __all__ = [
     "get_outfit_designer_prompt",
     "MAX_RETRIES",
     "BASE_DELAY",
+    "VIDEO_GEN_CONCURRENCY",
+    "VIDEO_GEN_TIMEOUT",
+    "VIDEO_GEN_BUDGET",
+    "OUTFIT_IMAGE_BASE_DIR",
+    "STORAGE_THREAD_POOL_SIZE",
     "MCP_SCRAPER_CONFIG",
     "MCP_IMAGE_CONFIG",
     "MCP_VIDEO_CONFIG",
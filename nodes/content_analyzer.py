@@ -9,6 +9,9 @@ import json
 import asyncio
 import re
 from typing import Dict, Any
+
+import aiofiles
+import orjson
 from langgraph.func import task
 from langchain_core.messages import HumanMessage
 
@@ -19,6 +22,10 @@ from fashion_agent.agents import build_agent2_modern
 from langchain_core.messages import AIMessage
 
 
+# Extracts the server-suggested delay from rate-limit errors, e.g. "retry in 12.5s"
+_RETRY_RE = re.compile(r"retry in ([\d.]+)s")
+
+
 async def content_analyzer_node(state: Dict[str, Any], config) -> Dict[str, Any]:
     """
     LangGraph node for content analysis.
@@ -104,7 +111,7 @@ async def content_analyzer_node(state: Dict[str, Any], config) -> Dict[str, Any]
                         # Extract token usage from messages
                         messages = result.get("messages", [])
                         for msg in reversed(messages):
-                            if isinstance(msg, AIMessage) and hasattr(msg, 'usage_metadata') and msg.usage_metadata:
+                            if isinstance(msg, AIMessage) and getattr(msg, 'usage_metadata', None):
                                 token_tracker.set_current_agent("content_analyzer")
                                 token_tracker.add_usage(
                                     input_tokens=msg.usage_metadata.get("input_tokens", 0),
@@ -139,7 +146,7 @@ async def content_analyzer_node(state: Dict[str, Any], config) -> Dict[str, Any]
                     error_str = str(e)
                     if "429" in error_str or "quota" in error_str.lower() or "rate" in error_str.lower():
                         if attempt < MAX_RETRIES:
-                            delay_match = re.search(r"retry in ([\d.]+)s", error_str)
+                            delay_match = _RETRY_RE.search(error_str)
                             if delay_match:
                                 delay = float(delay_match.group(1))
                             else:
@@ -160,19 +167,17 @@ async def content_analyzer_node(state: Dict[str, Any], config) -> Dict[str, Any]
         console_logger.info("SUCCESS: Content analyzer completed successfully")
         
         # Convert back to Pydantic model for processing
-        structured_output = ContentAnalysisOutput(**structured_output_dict)
+        structured_output = ContentAnalysisOutput.model_validate(structured_output_dict)
         
-        # Use @task for blocking file write to avoid blocking async event loop
-        @task
-        def save_output_to_disk():
-            with open("data/content_analyzer_output.json", "w") as f:
-                json.dump(structured_output.model_dump(), f, indent=2)
+        # The same JSON bytes are logged and persisted
+        output_json = orjson.dumps(structured_output.model_dump(), option=orjson.OPT_INDENT_2)
         
         file_logger.info("="*80)
         file_logger.info("CONTENT ANALYZER RAW OUTPUT:")
-        file_logger.info(json.dumps(structured_output.model_dump(), indent=2))
+        file_logger.info(output_json.decode())
         file_logger.info("="*80)
-        await save_output_to_disk()
+        async with aiofiles.open("data/content_analyzer_output.json", "wb") as f:
+            await f.write(output_json)
         file_logger.info("Content analyzer output saved")
         
         return {
@@ -11,6 +11,9 @@ import traceback
 import re
 from datetime import datetime
 from typing import Dict, Any
+
+import aiofiles
+import orjson
 from langgraph.func import task
 from langchain_core.messages import HumanMessage
 
@@ -21,6 +24,10 @@ from fashion_agent.agents import build_agent1_modern
 from langchain_core.messages import AIMessage
 
 
+# Extracts the server-suggested delay from rate-limit errors, e.g. "retry in 12.5s"
+_RETRY_RE = re.compile(r"retry in ([\d.]+)s")
+
+
 async def data_collector_node(state: Dict[str, Any], config) -> Dict[str, Any]:
     """
     LangGraph node for data collection.
@@ -120,7 +127,7 @@ async def data_collector_node(state: Dict[str, Any], config) -> Dict[str, Any]:
                         token_usage = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
                         messages = result.get("messages", [])
                         for msg in reversed(messages):
-                            if isinstance(msg, AIMessage) and hasattr(msg, 'usage_metadata') and msg.usage_metadata:
+                            if isinstance(msg, AIMessage) and getattr(msg, 'usage_metadata', None):
                                 token_usage = {
                                     "input_tokens": msg.usage_metadata.get("input_tokens", 0),
                                     "output_tokens": msg.usage_metadata.get("output_tokens", 0),
@@ -163,7 +170,7 @@ async def data_collector_node(state: Dict[str, Any], config) -> Dict[str, Any]:
                     error_str = str(e)
                     if "429" in error_str or "quota" in error_str.lower() or "rate" in error_str.lower():
                         if attempt < MAX_RETRIES:
-                            delay_match = re.search(r"retry in ([\d.]+)s", error_str)
+                            delay_match = _RETRY_RE.search(error_str)
                             if delay_match:
                                 delay = float(delay_match.group(1))
                             else:
@@ -183,19 +190,17 @@ async def data_collector_node(state: Dict[str, Any], config) -> Dict[str, Any]:
         structured_output_dict = await run_data_collector_agent()
         
         # Convert back to Pydantic model for processing
-        structured_output = DataCollectorOutput(**structured_output_dict)
+        structured_output = DataCollectorOutput.model_validate(structured_output_dict)
         
-        # Use @task for blocking file write to avoid blocking async event loop
-        @task
-        def save_output_to_disk():
-            with open("data/data_collector_output.json", "w") as f:
-                json.dump(structured_output.model_dump(), f, indent=2)
+        # The same JSON bytes are logged and persisted
+        output_json = orjson.dumps(structured_output.model_dump(), option=orjson.OPT_INDENT_2)
         
         file_logger.info("="*80)
         file_logger.info("DATA COLLECTOR RAW OUTPUT:")
-        file_logger.info(json.dumps(structured_output.model_dump(), indent=2))
+        file_logger.info(output_json.decode())
         file_logger.info("="*80)
-        await save_output_to_disk()
+        async with aiofiles.open("data/data_collector_output.json", "wb") as f:
+            await f.write(output_json)
         file_logger.info("Data collector output saved")
         
         # Create return dictionary with proper state isolation
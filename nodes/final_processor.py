@@ -6,7 +6,9 @@ import os
 import time
 import traceback
 from typing import Dict, Any
-from langgraph.func import task
+
+import aiofiles
+import orjson
 
 from fashion_agent.config import file_logger, console_logger, MAX_RETRIES, BASE_DELAY, token_tracker
 from fashion_agent.state import TrendAnalysisList
@@ -142,7 +144,7 @@ async def final_processor_node(state: Dict[str, Any], config) -> Dict[str, Any]:
                     # Extract token usage
                     messages = result.get("messages", [])
                     for msg in reversed(messages):
-                        if isinstance(msg, AIMessage) and hasattr(msg, 'usage_metadata') and msg.usage_metadata:
+                        if isinstance(msg, AIMessage) and getattr(msg, 'usage_metadata', None):
                             token_tracker.set_current_agent("final_processor")
                             token_tracker.add_usage(
                                 input_tokens=msg.usage_metadata.get("input_tokens", 0),
@@ -153,26 +155,24 @@ async def final_processor_node(state: Dict[str, Any], config) -> Dict[str, Any]:
                     
                     # Ensure it's a TrendAnalysisList instance
                     if not isinstance(structured_output, TrendAnalysisList):
-                        structured_output = TrendAnalysisList(**structured_output)
+                        structured_output = TrendAnalysisList.model_validate(structured_output)
                 elif isinstance(result, TrendAnalysisList):
                     structured_output = result
                 else:
                     raise ValueError(f"Unexpected result structure: {type(result)}, missing structured_response key")
                 
                 if structured_output:
+                    # The same JSON bytes are logged and persisted
+                    output_json = orjson.dumps(structured_output.model_dump(), option=orjson.OPT_INDENT_2)
+                    
                     # Log raw output
                     file_logger.info("="*80)
                     file_logger.info("FINAL PROCESSOR RAW OUTPUT:")
-                    file_logger.info(json.dumps(structured_output.model_dump(), indent=2))
+                    file_logger.info(output_json.decode())
                     file_logger.info("="*80)
                     
-                    # Use @task for blocking file write to avoid blocking async event loop
-                    @task
-                    def save_output_to_disk():
-                        with open("data/trend_processor_output.json", "w") as f:
-                            json.dump(structured_output.model_dump(), f, indent=4)
-                    
-                    await save_output_to_disk()
+                    async with aiofiles.open("data/trend_processor_output.json", "wb") as f:
+                        await f.write(output_json)
                     file_logger.info("Final processor output saved")
                     
                     # Update storage
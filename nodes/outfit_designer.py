@@ -5,33 +5,48 @@ import json
 import os
 import time
 import traceback
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 import aiofiles
+import orjson
 
 from fashion_agent.config import file_logger, console_logger, MAX_RETRIES, BASE_DELAY, token_tracker
 from fashion_agent.state import ListofOutfits
 from fashion_agent.agents.builders import build_agent5_modern
+from fashion_agent.utils import storage
 from langchain_core.messages import AIMessage
 
 
+# orjson handles numpy arrays, datetimes and UUIDs natively, so trend data
+# carrying any of these serializes without a per-value default= callback
+_JSON_DUMP_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC
+
+
 # Async file I/O helpers to avoid pickling issues with lambda in asyncio.to_thread
 async def save_json_async(filepath: str, data: dict) -> None:
     """Async helper to save JSON data to file."""
-    async with aiofiles.open(filepath, "w") as f:
-        await f.write(json.dumps(data, indent=4))
+    async with aiofiles.open(filepath, "wb") as f:
+        await f.write(orjson.dumps(data, option=_JSON_DUMP_OPTIONS))
 
 
-async def load_json_async(filepath: str) -> dict:
-    """Async helper to load JSON data from file."""
-    async with aiofiles.open(filepath, "r") as f:
-        content = await f.read()
-        return json.loads(content)
+def _load_json_if_exists(filepath: str) -> Optional[dict]:
+    """Read and parse a JSON file, or return None if it is missing or unreadable."""
+    if not os.path.exists(filepath):
+        return None
+    try:
+        with open(filepath, "rb") as f:
+            return orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError) as e:
+        file_logger.warning(f"Ignoring unreadable JSON file {filepath}: {e}")
+        return None
 
 
-async def file_exists_async(filepath: str) -> bool:
-    """Async helper to check if file exists."""
-    return await asyncio.to_thread(os.path.exists, filepath)
+async def load_json_if_exists(filepath: str) -> Optional[dict]:
+    """Async helper to load JSON data from file if it exists.
+    
+    The existence check and the read share a single thread hop.
+    """
+    return await asyncio.to_thread(_load_json_if_exists, filepath)
 
 
 async def outfit_designer_node(state: Dict[str, Any], config) -> Dict[str, Any]:
@@ -41,10 +56,10 @@ async def outfit_designer_node(state: Dict[str, Any], config) -> Dict[str, Any]:
     # async def load_outfit_designer_output():
     #     """Check if cached outfit designer output exists."""
     #     output_file = "data/outfit_designer_output.json"
-    #     if await file_exists_async(output_file):
+    #     data = await load_json_if_exists(output_file)
+    #     if data is not None:
     #         try:
-    #             data = await load_json_async(output_file)
-    #             structured_output = ListofOutfits(**data)
+    #             structured_output = ListofOutfits.model_construct(**data)  # Trusted: written by this node
     #             
     #             file_logger.info("Loaded Outfit Designer output from file, skipping agent execution.")
     #             
@@ -102,7 +117,6 @@ async def outfit_designer_node(state: Dict[str, Any], config) -> Dict[str, Any]:
     # if not is_edit_request:
     #     cached = await load_outfit_designer_output()
     #     if cached:
-    #         from ..utils import storage
     #         await asyncio.to_thread(storage.update_outfit_generation,
     #                                record_id=f"fashion_analysis_{config['configurable']['thread_id']}",
     #                                data=cached)
@@ -118,6 +132,8 @@ async def outfit_designer_node(state: Dict[str, Any], config) -> Dict[str, Any]:
     console_logger.info("Starting Outfit Designer Agent...")
     
     try:
+        record_id = f"fashion_analysis_{config['configurable']['thread_id']}"
+        
         # Get trend analysis from final processor output stored in final_processor
         final_processor = state.get("final_processor", {})
         trend_analysis = final_processor.get("trend_analysis", {})
@@ -201,7 +217,7 @@ async def outfit_designer_node(state: Dict[str, Any], config) -> Dict[str, Any]:
                 # Extract token usage before deleting result
                 messages = result.get("messages", []) if isinstance(result, dict) else []
                 for msg in reversed(messages):
-                    if isinstance(msg, AIMessage) and hasattr(msg, 'usage_metadata') and msg.usage_metadata:
+                    if isinstance(msg, AIMessage) and getattr(msg, 'usage_metadata', None):
                         token_tracker.set_current_agent("outfit_designer")
                         token_tracker.add_usage(
                             input_tokens=msg.usage_metadata.get("input_tokens", 0),
@@ -228,16 +244,20 @@ async def outfit_designer_node(state: Dict[str, Any], config) -> Dict[str, Any]:
             raise RuntimeError("Failed to get outfit designer output after all retries")
         
         # Convert back to Pydantic model for processing
-        structured_output = ListofOutfits(**output_data)
+        structured_output = ListofOutfits.model_validate(output_data)
+        
+        # The same orjson bytes are logged and persisted
+        output_json = orjson.dumps(output_data, option=_JSON_DUMP_OPTIONS)
         
         # Log raw output
         file_logger.info("="*80)
         file_logger.info("OUTFIT DESIGNER RAW OUTPUT:")
-        file_logger.info(json.dumps(output_data, indent=2))
+        file_logger.info(output_json.decode())
         file_logger.info("="*80)
         
         # Persist to disk using proper async file operations
-        await save_json_async("data/outfit_designer_output.json", output_data)
+        async with aiofiles.open("data/outfit_designer_output.json", "wb") as f:
+            await f.write(output_json)
         
         # Create dashboard data by combining trend analysis and outfit designs
         dashboard_data = {
@@ -248,9 +268,8 @@ async def outfit_designer_node(state: Dict[str, Any], config) -> Dict[str, Any]:
         file_logger.info("Created data/dashboard_data.json with trend analysis and outfit designs")
         
         # Update storage
-        from ..utils import storage
         await asyncio.to_thread(storage.update_outfit_generation,
-                              record_id=f"fashion_analysis_{config['configurable']['thread_id']}",
+                              record_id=record_id,
                               data=output_data)
         
         # Prepare return with reset of review decision so outfit_reviewer can run again
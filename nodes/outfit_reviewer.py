@@ -1,12 +1,26 @@
 """Outfit Reviewer Node - Human review and approval of outfit designs."""
 
-from typing import Dict, Any
+from typing import Dict, Any, List
+from typing_extensions import TypedDict
 from langgraph.types import interrupt
 
 from fashion_agent.config import file_logger
 from fashion_agent.state import OutfitReviewDecision
 
 
+class OutfitPresentationDict(TypedDict, total=False):
+    """Fields of a dumped OutfitDesignOutput that the reviewer presents.
+    
+    outfit_designs already holds plain dicts, so the reviewer reads them
+    directly instead of re-validating them into ListofOutfits.
+    """
+    outfit_name: str
+    outfit_description: str
+    dominant_colors: List[str]
+    style_tags: List[str]
+    saved_image_path: str
+
+
 async def outfit_reviewer_node(state: Dict[str, Any], config) -> Dict[str, Any]:
     """
     Present outfit designs to user for review and approval.
@@ -68,7 +82,7 @@ async def outfit_reviewer_node(state: Dict[str, Any], config) -> Dict[str, Any]:
     
     # Extract outfit data for presentation
     outfits_data = outfit_designs[0] if outfit_designs else {}
-    outfits_list = outfits_data.get("Outfits", [])
+    outfits_list: List[OutfitPresentationDict] = outfits_data.get("Outfits", [])
     
     # Format outfits for review
     review_payload = {
@@ -102,10 +116,11 @@ async def outfit_reviewer_node(state: Dict[str, Any], config) -> Dict[str, Any]:
     
     # Interrupt for human review
     review_response = interrupt(review_payload)
-    print("--------------", review_response)
+    file_logger.debug("Raw review_response from interrupt: %r", review_response)
+    
     # Validate review decision
     try:
-        decision = OutfitReviewDecision(**review_response)
+        decision = OutfitReviewDecision.model_validate(review_response)
         
         # Validate required fields
         if decision.decision_type == "reject" and not decision.rejection_feedback:
@@ -116,12 +131,15 @@ async def outfit_reviewer_node(state: Dict[str, Any], config) -> Dict[str, Any]:
         
         file_logger.info(f"Outfit review decision: {decision.decision_type}")
         
+        # Serialize once; every branch below stores the same payload in state
+        decision_dict = decision.model_dump()
+        
         # Handle different decision types
         if decision.decision_type == "approve":
             file_logger.info("Outfits approved - proceeding to video generation")
             return {
                 "awaiting_outfit_review": False,
-                "outfit_review_decision": decision.model_dump(),
+                "outfit_review_decision": decision_dict,
                 "execution_status": {
                     **state.get("execution_status", {}),
                     "outfit_reviewer": "completed"
@@ -132,7 +150,7 @@ async def outfit_reviewer_node(state: Dict[str, Any], config) -> Dict[str, Any]:
             file_logger.warning(f"Outfits rejected: {decision.rejection_feedback}")
             return {
                 "awaiting_outfit_review": False,
-                "outfit_review_decision": decision.model_dump(),
+                "outfit_review_decision": decision_dict,
                 "errors": {
                     **state.get("errors", {}),
                     "outfit_reviewer": f"Designs rejected: {decision.rejection_feedback}"
@@ -148,7 +166,7 @@ async def outfit_reviewer_node(state: Dict[str, Any], config) -> Dict[str, Any]:
             # Store edit instructions for outfit designer to use
             return {
                 "awaiting_outfit_review": True,  # Will need another review after regeneration
-                "outfit_review_decision": decision.model_dump(),
+                "outfit_review_decision": decision_dict,
                 "execution_status": {
                     **state.get("execution_status", {}),
                     "outfit_reviewer": "edit_requested"
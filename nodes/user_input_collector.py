@@ -1,5 +1,6 @@
 """User Input Collector Node - Collects custom URLs and images from users before workflow starts."""
 
+import copy
 from typing import Dict, Any
 from langgraph.types import interrupt
 
@@ -7,6 +8,10 @@ from fashion_agent.config import file_logger
 from fashion_agent.state import UserInput
 
 
+# Default (empty) user input, dumped once instead of on every fallback
+_EMPTY_USER_INPUT = UserInput().model_dump()
+
+
 async def user_input_collector_node(state: Dict[str, Any], config) -> Dict[str, Any]:
     """
     Collect custom URLs and images from user at workflow start.
@@ -53,7 +58,7 @@ async def user_input_collector_node(state: Dict[str, Any], config) -> Dict[str,
             user_input_data = user_response
             query_override = None
         
-        user_input = UserInput(**user_input_data)
+        user_input = UserInput.model_validate(user_input_data)
         file_logger.info(f"User input collected: {len(user_input.custom_urls)} URLs, "
                         f"{len(user_input.custom_images)} images, "
                         f"{len(user_input.custom_videos)} videos")
@@ -66,6 +71,6 @@ async def user_input_collector_node(state: Dict[str, Any], config) -> Dict[str,
         file_logger.error(f"Error processing user input: {e}")
         # Return empty user input if validation fails
         return {
-            "user_input": UserInput().model_dump(),
+            "user_input": copy.deepcopy(_EMPTY_USER_INPUT),  # Copy so list fields are never shared
             "query": state.get("query", "Fashion trend analysis")
         }
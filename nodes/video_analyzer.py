@@ -11,9 +11,13 @@ VIDEO URL CONFIGURATION:
 import os
 import json
 import asyncio
+import random
 import re
 import traceback
 from typing import Dict, Any
+
+import aiofiles
+import orjson
 from langgraph.func import task
 from langchain_core.messages import HumanMessage
 
@@ -25,6 +29,31 @@ from fashion_agent.tools import load_video_urls
 from langchain_core.messages import AIMessage
 
 
+# Extracts the server-suggested delay from rate-limit errors, e.g. "retry in 12.5s"
+_RETRY_RE = re.compile(r"retry in ([\d.]+)s")
+
+# Transient failures worth retrying: rate limits, overloaded/5xx upstreams and dropped connections.
+# Status codes and phrases are matched whole so e.g. "generate" or "15003" don't qualify.
+_RETRYABLE_ERROR_RE = re.compile(
+    r"\b(?:429|5\d\d)\b|\brate[ _-]?limit|\bresource[ _]exhausted\b|\bquota\b|\boverloaded\b"
+    r"|\bunavailable\b|\btimed out\b|\bdeadline[ _]exceeded\b|\bconnection (?:reset|refused|aborted|closed|error)\b",
+    re.IGNORECASE
+)
+
+
+def _is_retryable_error(error: Exception) -> bool:
+    """Classify an agent failure by exception type and HTTP status first, message text last."""
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    if isinstance(status, int):
+        return status == 429 or 500 <= status < 600
+    return bool(_RETRYABLE_ERROR_RE.search(str(error)))
+
+_ATTEMPT_TIMEOUT = 120.0  # seconds per agent call
+_TOTAL_TIMEOUT = 600  # seconds across all retries
+
+
 async def video_analyzer_node(state: Dict[str, Any], config) -> Dict[str, Any]:
     """
     LangGraph node for video analysis.
@@ -131,7 +160,7 @@ async def video_analyzer_node(state: Dict[str, Any], config) -> Dict[str, Any]:
                             {"messages": [HumanMessage(content=user_input)]},
                             config={"configurable": {"checkpoint_ns": ""}}  # Disable checkpointing for subgraph
                         ),
-                        timeout=300.0  # 5 minutes timeout
+                        timeout=_ATTEMPT_TIMEOUT
                     )
                     file_logger.info(f"Video Analyzer result type: {type(result)}")
                     
@@ -151,7 +180,7 @@ async def video_analyzer_node(state: Dict[str, Any], config) -> Dict[str, Any]:
                         # Extract token usage from messages
                         messages = result.get("messages", [])
                         for msg in reversed(messages):
-                            if isinstance(msg, AIMessage) and hasattr(msg, 'usage_metadata') and msg.usage_metadata:
+                            if isinstance(msg, AIMessage) and getattr(msg, 'usage_metadata', None):
                                 token_tracker.set_current_agent("video_analyzer")
                                 token_tracker.add_usage(
                                     input_tokens=msg.usage_metadata.get("input_tokens", 0),
@@ -177,62 +206,77 @@ async def video_analyzer_node(state: Dict[str, Any], config) -> Dict[str, Any]:
                 except asyncio.TimeoutError:
                     file_logger.error(f"Video analyzer timed out on attempt {attempt + 1}")
                     if attempt < MAX_RETRIES:
-                        await asyncio.sleep(BASE_DELAY)
+                        # Jittered backoff so concurrent runs don't re-submit in lockstep
+                        await asyncio.sleep(random.uniform(2, 4) * (attempt + 1))
                         continue
                     else:
                         raise RuntimeError("Video analyzer exceeded max retries due to timeouts")
                 except Exception as e:
                     error_str = str(e)
-                    if "429" in error_str or "quota" in error_str.lower() or "rate" in error_str.lower():
+                    if _is_retryable_error(e):
                         if attempt < MAX_RETRIES:
-                            delay_match = re.search(r"retry in ([\d.]+)s", error_str)
+                            delay_match = _RETRY_RE.search(error_str)
                             if delay_match:
                                 delay = float(delay_match.group(1))
                             else:
                                 delay = BASE_DELAY * (2 ** attempt)
-                            file_logger.warning(f"Rate limit hit in video analyzer (attempt {attempt + 1}). Retrying in {delay} seconds...")
+                            file_logger.warning(f"Retryable error in video analyzer (attempt {attempt + 1}). Retrying in {delay} seconds...")
                             file_logger.warning(f"Error details: {error_str}")
                             await asyncio.sleep(delay)
                             continue
                         else:
-                            file_logger.error(f"Max retries exceeded for rate limiting in video analyzer: {e}")
+                            file_logger.error(f"Max retries exceeded for retryable error in video analyzer: {e}")
                             raise
                     else:
-                        file_logger.error(f"Non-rate-limit error in video analyzer: {e}")
+                        file_logger.error(f"Non-retryable error in video analyzer: {e}")
                         raise
         
-        # Execute agent in isolated task context - returns serialized dict
-        structured_output_dict = await run_video_analyzer_agent()
+        # Execute agent in isolated task context - returns serialized dict.
+        # The outer budget bounds all retries together so this branch can't stall the graph.
+        timeout_error = None
+        try:
+            async with asyncio.timeout(_TOTAL_TIMEOUT):
+                structured_output_dict = await run_video_analyzer_agent()
+        except TimeoutError:
+            timeout_error = f"Video analyzer exceeded its {_TOTAL_TIMEOUT}s budget"
+            file_logger.error(f"{timeout_error}, continuing with empty video analysis")
+            structured_output_dict = VideoTrendOutput(
+                per_video_results=[],
+                metrics_summary={},
+                trending_elements={},
+                commercial_insights={},
+                technical_quality={}
+            ).model_dump()
         
         # Convert back to Pydantic model for processing
-        structured_output = VideoTrendOutput(**structured_output_dict)
+        structured_output = VideoTrendOutput.model_validate(structured_output_dict)
+        # Serialize once; the log, disk copy and state update all share this dict
+        output_data = structured_output.model_dump()
         
-        # Use @task for blocking file write to avoid blocking async event loop
-        @task
-        def save_output_to_disk():
-            with open("data/video_analyzer_output.json", "w") as f:
-                json.dump(structured_output.model_dump(), f, indent=2)
+        # The same JSON bytes are logged and persisted
+        output_json = orjson.dumps(output_data, option=orjson.OPT_INDENT_2)
         
         file_logger.info("="*80)
         file_logger.info("VIDEO ANALYZER RAW OUTPUT:")
-        file_logger.info(json.dumps(structured_output.model_dump(), indent=2))
+        file_logger.info(output_json.decode())
         file_logger.info("="*80)
-        await save_output_to_disk()
+        async with aiofiles.open("data/video_analyzer_output.json", "wb") as f:
+            await f.write(output_json)
         file_logger.info("Video analyzer output saved")
         
         # Create return dictionary with proper state isolation
+        agent_memories = dict(state.get("agent_memories", {}))
+        agent_memories["video_analyzer"] = {"processed_videos": len(video_urls)}
+        execution_status = dict(state.get("execution_status", {}))
+        execution_status["video_analyzer"] = "completed"
         return_dict = {
-            "video_analysis": [structured_output.model_dump()],
-            "agent_memories": {
-                **state.get("agent_memories", {}),
-                "video_analyzer": {"processed_videos": len(video_urls)}
-            },
-            "execution_status": {
-                **state.get("execution_status", {}),
-                "video_analyzer": "completed"
-            },
+            "video_analysis": [output_data],
+            "agent_memories": agent_memories,
+            "execution_status": execution_status,
             "token_usage": token_tracker.get_usage()
         }
+        if timeout_error:
+            return_dict["errors"] = {**state.get("errors", {}), "video_analyzer": timeout_error}
         
         console_logger.info(f"Video analyzer returning analysis with {len(return_dict['video_analysis'])} results")
         file_logger.debug(f"Video return dict keys: {list(return_dict.keys())}")
@@ -1,15 +1,224 @@
 """Video Generator Node - Generates videos from outfit designs."""
 
 import asyncio
-import json
+import functools
+import hashlib
+import logging
 import os
 import time
 import traceback
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 
-from fashion_agent.config import file_logger, console_logger
-from fashion_agent.state import VideoGenerationCollectionOutput, VideoGenerationOutput
+import aiofiles
+import orjson
+from typing_extensions import TypedDict
+
+from fashion_agent.config import (
+    file_logger, console_logger, VIDEO_GEN_CONCURRENCY, VIDEO_GEN_TIMEOUT, VIDEO_GEN_BUDGET,
+    OUTFIT_IMAGE_BASE_DIR, STORAGE_THREAD_POOL_SIZE
+)
 from fashion_agent.tools.helpers import make_video
+from fashion_agent.utils import storage
+
+
+# Caps concurrent make_video calls so a large outfit batch doesn't flood the Veo API
+_VIDEO_SEM = asyncio.Semaphore(VIDEO_GEN_CONCURRENCY)
+
+
+class _VideoOutputDict(TypedDict):
+    """Plain-dict mirror of state.VideoGenerationOutput, built per outfit without Pydantic."""
+    outfit_id: str
+    input_image_path: str
+    output_video_path: str
+    generation_success: bool
+    generation_time: float
+    error_message: str
+    video_duration: float
+    video_format: str
+
+
+# Slow Supabase/DB round trips run here so they can't starve the default
+# pool that serves the quick image hashing and filesystem calls
+_STORAGE_EXECUTOR = ThreadPoolExecutor(max_workers=STORAGE_THREAD_POOL_SIZE, thread_name_prefix="fa-storage")
+
+# Strong references to fire-and-forget archive tasks so they aren't garbage collected mid-run
+_BACKGROUND_TASKS = set()
+
+# Parallel Supabase uploads while videos are still generating
+_UPLOAD_WORKERS = 4
+
+# Folded into every content hash; bump when prompts or the Veo model change
+_VIDEO_CACHE_VERSION = b"veo-3.0-generate-001/v1"
+
+
+class _VideoCircuitBreaker:
+    """Fails make_video calls fast once the backend has failed repeatedly.
+    
+    After `threshold` consecutive failures the circuit opens; once `cooldown`
+    seconds pass a single probe call is let through (half-open) and every
+    other caller is rejected until that probe's outcome decides whether the
+    circuit closes again.
+    """
+    
+    def __init__(self, threshold: int = 5, cooldown: float = 60.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.fail_count = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+    
+    def allow(self) -> Optional[bool]:
+        """Admit or reject a call: None rejects it, otherwise the value says whether it is the probe."""
+        if self.fail_count < self.threshold:
+            return False
+        # A probe can run for up to VIDEO_GEN_TIMEOUT, far longer than the cool-down
+        if self.probe_in_flight:
+            return None
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            self.probe_in_flight = True
+            return True
+        return None
+    
+    def record(self, success: bool, is_probe: bool) -> None:
+        if is_probe:
+            self.probe_in_flight = False
+        elif self.fail_count >= self.threshold:
+            # Admitted before the circuit opened; only the probe decides whether it closes
+            return
+        if success:
+            self.fail_count = 0
+        else:
+            self.fail_count += 1
+            self.opened_at = time.monotonic()
+    
+    def release(self, is_probe: bool) -> None:
+        """Free the half-open slot when the probe ends without an outcome, e.g. on cancellation."""
+        if is_probe:
+            self.probe_in_flight = False
+
+
+_VIDEO_BREAKER = _VideoCircuitBreaker()
+
+
+def _flatten_outfits(outfit_designs: List[Any]) -> List[Tuple[str, Dict[str, Any]]]:
+    """Flatten design collections into (outfit_id, outfit_dict) pairs.
+    
+    Handles ListofOutfits dicts keyed by 'Outfits' or 'outfits' as well as
+    bare single-outfit dicts. Outfits without any name or id get a
+    positional `outfit_N` id.
+    """
+    flat = []
+    for design_collection in outfit_designs:
+        if not isinstance(design_collection, dict):
+            continue
+        outfits_list = design_collection.get('Outfits') or design_collection.get('outfits') or [design_collection]
+        for outfit in outfits_list:
+            outfit_dict = outfit if isinstance(outfit, dict) else {}
+            outfit_id = (
+                outfit_dict.get('outfit_name') or
+                outfit_dict.get('outfit_id') or
+                outfit_dict.get('id') or
+                outfit_dict.get('name') or
+                f"outfit_{len(flat) + 1}"
+            )
+            flat.append((outfit_id, outfit_dict))
+    return flat
+
+
+def _image_content_hash(image_path: str) -> Optional[str]:
+    """Hash an outfit image for the video cache, or None if it can't be read.
+    
+    Remote images are keyed by URL since Supabase object paths are unique per upload.
+    """
+    hasher = hashlib.blake2b(_VIDEO_CACHE_VERSION, digest_size=16)
+    if image_path.startswith(('http://', 'https://')):
+        hasher.update(image_path.encode())
+        return hasher.hexdigest()
+    try:
+        with open(image_path, "rb") as f:
+            hasher.update(f.read())
+    except OSError:
+        return None
+    return hasher.hexdigest()
+
+
+async def _image_content_hash_async(image_path: str) -> Optional[str]:
+    """Hash an outfit image, using a worker thread only when file bytes must be read."""
+    if image_path.startswith(('http://', 'https://')):
+        return _image_content_hash(image_path)
+    return await asyncio.to_thread(_image_content_hash, image_path)
+
+
+async def _run_storage(func, *args, **kwargs):
+    """Run a blocking storage call on the dedicated storage executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_STORAGE_EXECUTOR, functools.partial(func, *args, **kwargs))
+
+
+def _on_archive_done(task: asyncio.Task) -> None:
+    """Release a finished archive task and surface any error it raised."""
+    _BACKGROUND_TASKS.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        file_logger.warning("Background video archive failed: %s", task.exception())
+
+
+async def _generate_video(outfit_id: str, image_path: str, content_hash: Optional[str]) -> Tuple[Dict[str, Any], float]:
+    """Run make_video for one outfit and return its result with the elapsed time.
+    
+    A cached video for the same image content is returned without generating.
+    Exceptions are folded into a failed result so one outfit cannot cancel
+    the others when run under asyncio.gather.
+    """
+    if content_hash:
+        cached = await _run_storage(storage.get_video_by_hash, content_hash)
+        if cached:
+            file_logger.info("Reusing cached video for outfit %s: %s", outfit_id, cached['video_url'])
+            return {"success": True, "output_path": None, "video_url": cached["video_url"],
+                    "duration": cached["video_duration"]}, 0.0
+    
+    queued_at = time.monotonic()
+    async with _VIDEO_SEM:
+        wait_time = time.monotonic() - queued_at
+        is_probe = _VIDEO_BREAKER.allow()
+        if is_probe is None:
+            file_logger.warning("Skipping video for outfit %s: circuit open after repeated failures", outfit_id)
+            return {"success": False, "output_path": None, "duration": 0.0,
+                    "error": "Video generation backend unavailable (circuit open)"}, 0.0
+        console_logger.info("Generating video for outfit: %s", outfit_id)
+        start_time = time.time()
+        try:
+            video_result = await asyncio.wait_for(make_video(image_path), timeout=VIDEO_GEN_TIMEOUT)
+        except asyncio.TimeoutError:
+            video_result = {"success": False, "output_path": None, "duration": 0.0,
+                            "error": f"Video generation timed out after {VIDEO_GEN_TIMEOUT}s"}
+        except asyncio.CancelledError:
+            _VIDEO_BREAKER.release(is_probe)
+            raise
+        except Exception as e:
+            video_result = {"success": False, "output_path": None, "duration": 0.0, "error": str(e)}
+        processing_time = time.time() - start_time
+        _VIDEO_BREAKER.record(bool(video_result.get('success')), is_probe)
+    file_logger.info("Outfit %s: waited %.2fs for a slot, generated in %.2fs", outfit_id, wait_time, processing_time)
+    return video_result, processing_time
+
+
+async def _upload_video(local_video_path: str, content_hash: Optional[str], duration: float) -> str:
+    """Upload a generated video to Supabase, falling back to the local path on failure.
+    
+    Successful uploads are recorded in the video cache under the image content hash.
+    """
+    try:
+        video_url = await _run_storage(storage.upload_video_to_supabase, local_video_path)
+        if video_url:
+            file_logger.info("Video uploaded to Supabase: %s", video_url)
+            if content_hash:
+                await _run_storage(storage.put_video_by_hash, content_hash, video_url, duration)
+            return video_url
+        file_logger.warning("Failed to upload video to Supabase, using local path")
+    except Exception as e:
+        file_logger.warning("Error uploading video to Supabase: %s, using local path", e)
+    return local_video_path
 
 
 async def video_generator_node(state: Dict[str, Any], config) -> Dict[str, Any]:
@@ -21,19 +230,20 @@ async def video_generator_node(state: Dict[str, Any], config) -> Dict[str, Any]:
     #     output_file = "data/video_generation_collection_output.json"
     #     if os.path.exists(output_file):
     #         try:
-    #             with open(output_file, "r") as f:
-    #                 structured_output = VideoGenerationCollectionOutput(**json.load(f))
+    #             with open(output_file, "rb") as f:
+    #                 # Trusted: written by this node as a plain dict, so no validation
+    #                 collection_dump = orjson.loads(f.read())
     #             
     #             file_logger.info("Loaded Video Generation output from file, skipping agent execution.")
     #             
     #             return {
-    #                 "outfit_videos": [structured_output.model_dump()],
+    #                 "outfit_videos": [collection_dump],
     #                 "agent_memories": {
     #                     **state.get("agent_memories", {}),
     #                     "video_generator": {
-    #                         "videos_generated": structured_output.successful_videos,
-    #                         "videos_failed": structured_output.failed_videos,
-    #                         "total_processing_time": structured_output.total_processing_time
+    #                         "videos_generated": collection_dump["successful_videos"],
+    #                         "videos_failed": collection_dump["failed_videos"],
+    #                         "total_processing_time": collection_dump["total_processing_time"]
     #                     }
     #                 },
     #                 "execution_status": {
@@ -45,21 +255,30 @@ async def video_generator_node(state: Dict[str, Any], config) -> Dict[str, Any]:
     #             file_logger.warning(f"Failed to load cached Video Generation output: {e}. Will rerun agent.")
     #     return None
     
-    async def _check_and_archive(result_dict: Dict[str, Any], config):
-        """Check if workflow is complete and archive if successful."""
-        from ..utils import storage
-        
-        await asyncio.to_thread(storage.update_video_generation,
-                               record_id=f"fashion_analysis_{config['configurable']['thread_id']}",
-                               data=result_dict)
+    async def _check_and_archive(result_dict: Dict[str, Any], record_id: str, video_paths: Optional[List[str]] = None):
+        """Archive this run's videos and report whether the workflow completed.
         
+        The video metadata and video files go to the DB in a single update on every
+        run; this is the terminal node, so nothing later would upload them for a
+        partial run. Completion only affects the status logging.
+        """
         execution_status = result_dict.get("execution_status", {})
         required_agents = ["data_collector", "video_analyzer", "content_analyzer", 
                           "final_processor", "outfit_designer", "video_generator"]
         all_completed = all(execution_status.get(agent) == "completed" for agent in required_agents)
         
-        file_logger.info(f"Workflow execution status: {execution_status}")
-        file_logger.info(f"All agents completed successfully: {all_completed}")
+        outfit_videos = result_dict.get("outfit_videos") or [{}]
+        try:
+            await _run_storage(storage.update_video_generation,
+                               record_id=record_id,
+                               data=outfit_videos[0],
+                               video_paths=video_paths,
+                               append=True)
+        except Exception as e:
+            file_logger.warning("Failed to update video_generation record in DB: %s", e)
+        
+        file_logger.info("Workflow execution status: %s", execution_status)
+        file_logger.info("All agents completed successfully: %s", all_completed)
         
         # Note: To access historical state/outputs, use graph.get_state_history(thread_id)
         # LangGraph checkpointer already persists all state at every superstep
@@ -68,26 +287,21 @@ async def video_generator_node(state: Dict[str, Any], config) -> Dict[str, Any]:
         else:
             file_logger.warning("Workflow did not complete successfully")
             failed_agents = [agent for agent in required_agents if execution_status.get(agent) != "completed"]
-            file_logger.warning(f"Failed/incomplete agents: {failed_agents}")
+            file_logger.warning("Failed/incomplete agents: %s", failed_agents)
     
     # CACHE DISABLED - Always run agent fresh
     # cached = load_cached_output()
     # if cached:
-    #     from ..utils import storage
-    #     await asyncio.to_thread(
-    #         storage.update_video_generation,
-    #         record_id=f"fashion_analysis_{config['configurable']['thread_id']}",
-    #         data=cached
-    #     )
-    #     
-    #     # Check if workflow is complete
-    #     await _check_and_archive(cached, config)
+    #     # Check if workflow is complete; this also writes the cached output to the DB
+    #     await _check_and_archive(cached, f"fashion_analysis_{config['configurable']['thread_id']}")
     #     
     #     return cached
     
     console_logger.info("Starting Video Generator Agent...")
     
     try:
+        record_id = f"fashion_analysis_{config['configurable']['thread_id']}"
+        
         # Get outfit designs from previous step
         outfit_designs = state.get("outfit_designs", [])
         
@@ -102,8 +316,7 @@ async def video_generator_node(state: Dict[str, Any], config) -> Dict[str, Any]:
                 }
             }
         
-        video_results = []
-        total_processing_time = 0.0
+        video_results: List[_VideoOutputDict] = []
         successful_videos = 0
         failed_videos = 0
         
@@ -111,202 +324,201 @@ async def video_generator_node(state: Dict[str, Any], config) -> Dict[str, Any]:
         # If empty, generate videos for all outfits (approved means all)
         outfit_review_decision = state.get("outfit_review_decision", {})
         selected_outfit_ids = outfit_review_decision.get("selected_outfit_ids", [])
+        selected_set = frozenset(selected_outfit_ids) if selected_outfit_ids else None
         
         if selected_outfit_ids:
-            file_logger.info(f"Filtering videos for selected outfits only: {selected_outfit_ids}")
+            file_logger.info("Filtering videos for selected outfits only: %s", selected_outfit_ids)
         else:
             file_logger.info("No specific outfits selected - generating videos for ALL approved outfits")
         
-        # Process each outfit design collection
-        for design_collection in outfit_designs:
-            if isinstance(design_collection, dict):
-                # Handle ListofOutfits structure - check for both 'outfits' and 'Outfits'
-                outfits_list = design_collection.get('Outfits') or design_collection.get('outfits', [])
-                console_logger.info(f"Processing {len(outfits_list)} outfits for video generation")
-                
-                if not outfits_list:
-                    # Single outfit structure
-                    outfits_list = [design_collection]
-                
-                for outfit in outfits_list:
-                    outfit_dict = outfit if isinstance(outfit, dict) else {}
-                    
-                    # Get outfit ID/name for filtering
-                    outfit_id = (
-                        outfit_dict.get('outfit_name') or
-                        outfit_dict.get('outfit_id') or
-                        outfit_dict.get('id') or
-                        outfit_dict.get('name') or
-                        f"outfit_{len(video_results) + 1}"
-                    )
-                    
-                    # FILTER: Skip outfits not in selected list (if any selected)
-                    if selected_outfit_ids and outfit_id not in selected_outfit_ids:
-                        file_logger.info(f"Skipping outfit '{outfit_id}' - not in selected list")
-                        continue
-                    
-                    # Extract image path from outfit
-                    image_path = (
-                        outfit_dict.get('saved_image_path') or 
-                        outfit_dict.get('image_path') or
-                        outfit_dict.get('output_image_path')
-                    )
-                    
-                    # FIX: Only prepend local path if it's a relative local path (not a URL)
-                    if image_path:
-                        if image_path.startswith(('http://', 'https://')):
-                            # It's a URL (e.g., Supabase), use as-is
-                            file_logger.info(f"Using remote URL for outfit {outfit_id}: {image_path}")
-                        elif not os.path.isabs(image_path):
-                            # Relative local path - prepend base directory
-                            image_path = os.path.join("D:/Downloads/FashionUseCase/scraapper/", image_path)
-                    
-                    if not image_path:
-                        file_logger.warning(f"No image path found for outfit: {outfit_id}")
-                        failed_videos += 1
-                        continue
-                    
-                    console_logger.info(f"Generating video for outfit: {outfit_id}")
-                    
-                    # Call make_video function
-                    start_time = time.time()
-                    video_result = await make_video(image_path)
-                    end_time = time.time()
-                    
-                    processing_time = end_time - start_time
-                    total_processing_time += processing_time
-                    
-                    # Upload video to Supabase and get public URL
-                    video_url = ''
-                    if video_result.get('success') and video_result.get('output_path'):
-                        try:
-                            from ..utils import storage
-                            local_video_path = video_result.get('output_path')
-                            video_url = await asyncio.to_thread(
-                                storage.upload_video_to_supabase, 
-                                local_video_path
-                            )
-                            if video_url:
-                                file_logger.info(f"Video uploaded to Supabase: {video_url}")
-                            else:
-                                file_logger.warning(f"Failed to upload video to Supabase, using local path")
-                                video_url = local_video_path
-                        except Exception as e:
-                            file_logger.warning(f"Error uploading video to Supabase: {e}, using local path")
-                            video_url = video_result.get('output_path', '')
-                    
-                    # Create video generation result with Supabase URL
-                    video_output = VideoGenerationOutput(
-                        outfit_id=outfit_id,
-                        input_image_path=image_path,
-                        output_video_path=video_url,  # Now stores Supabase URL instead of local path
-                        generation_success=video_result.get('success', False),
-                        generation_time=processing_time,
-                        error_message=video_result.get('error') or '',
-                        video_duration=video_result.get('duration', 0.0),
-                        video_format="mp4"
-                    )
-                    
-                    video_results.append(video_output.model_dump())
-                    
-                    if video_result.get('success'):
-                        successful_videos += 1
-                        file_logger.info(f"SUCCESS: Video generated for {outfit_id}: {video_result.get('output_path')}")
-                    else:
-                        failed_videos += 1
-                        file_logger.error(f"FAILED: Video generation for {outfit_id}: {video_result.get('error')}")
+        # Pass 1: flatten all design collections once, drop outfits not in the
+        # selected list (if any selected) and resolve image paths, collecting the
+        # jobs as parallel id/path lists for the passes below
+        all_outfits = _flatten_outfits(outfit_designs)
+        console_logger.info("Processing %s outfits for video generation", len(all_outfits))
         
-        # Create collection output - count only processed outfits (after filtering)
-        total_outfits_processed = successful_videos + failed_videos
+        outfit_ids = []
+        image_paths = []
+        for outfit_id, outfit_dict in all_outfits:
+            if selected_set is not None and outfit_id not in selected_set:
+                file_logger.info("Skipping outfit '%s' - not in selected list", outfit_id)
+                continue
+            
+            # Extract image path from outfit
+            image_path = (
+                outfit_dict.get('saved_image_path') or 
+                outfit_dict.get('image_path') or
+                outfit_dict.get('output_image_path')
+            )
+            
+            if not image_path:
+                file_logger.warning("No image path found for outfit: %s", outfit_id)
+                failed_videos += 1
+                continue
+            
+            # FIX: Only prepend local path if it's a relative local path (not a URL)
+            if image_path.startswith(('http://', 'https://')):
+                # It's a URL (e.g., Supabase), use as-is
+                file_logger.info("Using remote URL for outfit %s: %s", outfit_id, image_path)
+            elif not os.path.isabs(image_path):
+                # Relative local path - prepend base directory
+                image_path = os.path.join(OUTFIT_IMAGE_BASE_DIR, image_path)
+            
+            outfit_ids.append(outfit_id)
+            image_paths.append(image_path)
         
-        collection_output = VideoGenerationCollectionOutput(
-            total_outfits_processed=total_outfits_processed,
-            successful_videos=successful_videos,
-            failed_videos=failed_videos,
-            video_results=[VideoGenerationOutput(**result) for result in video_results],
-            total_processing_time=total_processing_time,
-            output_directory="videos/"
+        # Pass 2: hash input images so the same image renders at most once
+        content_hashes = await asyncio.gather(
+            *(_image_content_hash_async(image_path) for image_path in image_paths)
         )
+        unique_jobs = {}  # key -> (outfit_id, image_path, content_hash) of its first job
+        job_keys = []
+        for i, (outfit_id, image_path, content_hash) in enumerate(zip(outfit_ids, image_paths, content_hashes)):
+            key = content_hash or f"unhashed_{i}"
+            unique_jobs.setdefault(key, (outfit_id, image_path, content_hash))
+            job_keys.append(key)
+        unique_keys = list(unique_jobs)
         
-        # Log raw output
-        file_logger.info("="*80)
-        file_logger.info("VIDEO GENERATOR RAW OUTPUT:")
-        file_logger.info(json.dumps(collection_output.model_dump(), indent=2))
-        file_logger.info("="*80)
+        # Pass 3: generate all videos concurrently; each job reports its own failure.
+        # Finished videos feed a bounded upload queue drained by a fixed pool of
+        # uploaders, so Supabase uploads overlap generation without piling up.
+        # Outfits still rendering when the budget runs out are dropped so one
+        # straggler can't hold the node.
+        async def _generate_keyed(key: str):
+            return key, await _generate_video(*unique_jobs[key])
         
-        # Persist collection output to disk
-        await asyncio.to_thread(
-            lambda: json.dump(collection_output.model_dump(), 
-                            open("data/video_generation_collection_output.json", "w"), 
-                            indent=4)
-        )
+        upload_queue = asyncio.Queue(maxsize=2 * _UPLOAD_WORKERS)
+        url_by_key = {}
         
-        # Upload metadata and video files to Supabase
-        from ..utils import storage
-        record_id = f"fashion_analysis_{config['configurable']['thread_id']}"
+        async def _upload_worker():
+            while (item := await upload_queue.get()) is not None:
+                key, local_video_path, content_hash, duration = item
+                url_by_key[key] = await _upload_video(local_video_path, content_hash, duration)
         
-        # Update DB with the video generation metadata
-        try:
-            await asyncio.to_thread(storage.update_video_generation,
-                                  record_id=record_id,
-                                  data=collection_output.model_dump())
-        except Exception as e:
-            file_logger.warning(f"Failed to update video_generation metadata in DB: {e}")
-        
-        # Build full paths for each generated video and upload them to storage
-        try:
-            video_file_paths = []
-            for v in collection_output.video_results:
-                out_path = getattr(v, 'output_video_path', None) if hasattr(v, 'output_video_path') else (
-                    v.get('output_video_path') if isinstance(v, dict) else None
+        generation_tasks = [asyncio.create_task(_generate_keyed(key)) for key in unique_keys]
+        generated_by_key = {}
+        async with asyncio.TaskGroup() as uploaders:
+            for _ in range(_UPLOAD_WORKERS):
+                uploaders.create_task(_upload_worker())
+            try:
+                for next_done in asyncio.as_completed(generation_tasks, timeout=VIDEO_GEN_BUDGET):
+                    key, (video_result, processing_time) = await next_done
+                    generated_by_key[key] = (video_result, processing_time)
+                    if video_result.get('success') and video_result.get('output_path'):
+                        await upload_queue.put((
+                            key,
+                            video_result['output_path'],
+                            unique_jobs[key][2],
+                            video_result.get('duration', 0.0)
+                        ))
+            except TimeoutError:
+                unfinished = [task for task in generation_tasks if not task.done()]
+                file_logger.warning(
+                    "Video generation budget of %ss exhausted, dropping %s unfinished outfit video(s)",
+                    VIDEO_GEN_BUDGET, len(unfinished)
                 )
-                if not out_path:
-                    continue
-                
-                # Normalize and make absolute if relative
-                if not await asyncio.to_thread(os.path.isabs, out_path):
-                    full_path = await asyncio.to_thread(
-                        lambda p=out_path: os.path.normpath(os.path.join(os.getcwd(), p))
-                    )
-                else:
-                    full_path = await asyncio.to_thread(os.path.normpath, out_path)
-                video_file_paths.append(full_path)
+                for task in unfinished:
+                    task.cancel()
             
-            if video_file_paths:
-                await asyncio.to_thread(storage.update_videos,
-                                      record_id=record_id,
-                                      video_paths=video_file_paths,
-                                      append=True)
-        except Exception as e:
-            file_logger.warning(f"Failed to upload/update video files in DB: {e}")
+            # Pass 4: one sentinel per uploader; the TaskGroup waits for queued uploads to drain
+            for _ in range(_UPLOAD_WORKERS):
+                await upload_queue.put(None)
+        
+        # Sum of per-generation durations; outfits sharing an image rendered once
+        total_processing_time = sum(processing_time for _, processing_time in generated_by_key.values())
+        
+        # Pass 5: stitch finished results back in job order
+        for outfit_id, image_path, key in zip(outfit_ids, image_paths, job_keys):
+            if key not in generated_by_key:
+                file_logger.warning("Video for outfit %s did not finish within the budget", outfit_id)
+                continue
+            video_result, processing_time = generated_by_key[key]
+            video_url = url_by_key.get(key) or video_result.get('video_url', '')
+            
+            # Create video generation result with Supabase URL
+            video_results.append(_VideoOutputDict(
+                outfit_id=outfit_id,
+                input_image_path=image_path,
+                output_video_path=video_url,  # Now stores Supabase URL instead of local path
+                generation_success=bool(video_result.get('success', False)),
+                generation_time=processing_time,
+                error_message=video_result.get('error') or '',
+                video_duration=float(video_result.get('duration') or 0.0),
+                video_format="mp4"
+            ))
+            
+            if video_result.get('success'):
+                successful_videos += 1
+                file_logger.info("SUCCESS: Video generated for %s: %s", outfit_id, video_result.get('output_path') or video_url)
+            else:
+                failed_videos += 1
+                file_logger.error("FAILED: Video generation for %s: %s", outfit_id, video_result.get('error'))
+        
+        # Create collection output - count only processed outfits (after filtering)
+        total_outfits_processed = successful_videos + failed_videos
+        
+        # Plain dict in the state.VideoGenerationCollectionOutput shape; every field was produced
+        # above, so the log, disk copy, DB record and state update share it without Pydantic
+        collection_dump = {
+            "total_outfits_processed": total_outfits_processed,
+            "successful_videos": successful_videos,
+            "failed_videos": failed_videos,
+            "video_results": video_results,
+            "total_processing_time": total_processing_time,
+            "output_directory": "videos/"
+        }
         
-        file_logger.info(f"Video generation completed: {successful_videos} success, {failed_videos} failed")
+        collection_json = orjson.dumps(collection_dump, option=orjson.OPT_INDENT_2)
+        
+        # Log raw output; skip decoding the whole payload when INFO is filtered out
+        if file_logger.isEnabledFor(logging.INFO):
+            file_logger.info("="*80)
+            file_logger.info("VIDEO GENERATOR RAW OUTPUT:")
+            file_logger.info(collection_json.decode())
+            file_logger.info("="*80)
+        
+        # Persist collection output to disk
+        async with aiofiles.open("data/video_generation_collection_output.json", "wb") as f:
+            await f.write(collection_json)
+        
+        # Build full paths for each generated video; they are stored with the metadata below.
+        # Normalizing is pure string work, so it runs inline in one pass.
+        cwd = os.getcwd()
+        video_file_paths = [
+            os.path.normpath(v["output_video_path"] if os.path.isabs(v["output_video_path"])
+                             else os.path.join(cwd, v["output_video_path"]))
+            for v in video_results
+            if v["output_video_path"]
+        ]
+        
+        file_logger.info("Video generation completed: %s success, %s failed", successful_videos, failed_videos)
         
         # Build result dictionary
+        agent_memories = dict(state.get("agent_memories", {}))
+        agent_memories["video_generator"] = {
+            "videos_generated": successful_videos,
+            "videos_failed": failed_videos,
+            "total_processing_time": total_processing_time
+        }
+        execution_status = dict(state.get("execution_status", {}))
+        execution_status["video_generator"] = "completed"
         result_dict = {
-            "outfit_videos": [collection_output.model_dump()],
-            "agent_memories": {
-                **state.get("agent_memories", {}),
-                "video_generator": {
-                    "videos_generated": successful_videos,
-                    "videos_failed": failed_videos,
-                    "total_processing_time": total_processing_time
-                }
-            },
-            "execution_status": {
-                **state.get("execution_status", {}),
-                "video_generator": "completed"
-            }
+            "outfit_videos": [collection_dump],
+            "agent_memories": agent_memories,
+            "execution_status": execution_status
         }
         
-        # Check if workflow is complete and archive if successful
-        await _check_and_archive(result_dict, config)
+        # Check if workflow is complete and archive metadata + videos in one DB update.
+        # The graph doesn't depend on the archive, so it runs after the node returns.
+        archive_task = asyncio.create_task(_check_and_archive(result_dict, record_id, video_file_paths))
+        _BACKGROUND_TASKS.add(archive_task)
+        archive_task.add_done_callback(_on_archive_done)
         
         return result_dict
         
     except Exception as e:
-        file_logger.error(f"ERROR: Video Generator error: {e}")
-        file_logger.error(f"Video generator traceback: {traceback.format_exc()}")
+        file_logger.error("ERROR: Video Generator error: %s", e)
+        file_logger.error("Video generator traceback: %s", traceback.format_exc())
         return {
             "outfit_videos": [],
             "errors": {**state.get("errors", {}), "video_generator": str(e)},
@@ -9,14 +9,18 @@ from fashion_agent.tools.mcp_clients import (
     get_image_tools,
     get_video_tools,
     get_outfit_tools,
-    get_image_tool
+    get_image_tool,
+    invalidate_tool_cache
 )
 
 from fashion_agent.tools.helpers import (
     create_url_item,
+    create_url_items_bulk,
     make_video,
+    close_http_session,
     load_video_urls,
-    analyze_image_with_llm
+    analyze_image_with_llm,
+    analyze_images_with_llm
 )
 
 __all__ = [
@@ -31,9 +35,13 @@ __all__ = [
     "get_video_tools",
     "get_outfit_tools",
     "get_image_tool",
+    "invalidate_tool_cache",
     # Helpers
     "create_url_item",
+    "create_url_items_bulk",
     "make_video",
+    "close_http_session",
     "load_video_urls",
-    "analyze_image_with_llm"
+    "analyze_image_with_llm",
+    "analyze_images_with_llm"
 ]
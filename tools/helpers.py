@@ -4,12 +4,18 @@ Helper functions for tools and data processing.
 This module contains utility functions for:
 - URL item creation
 - Video generation
-- LLM-based image analysis
+- LLM-based image analysis (single and batched)
 """
 
+import asyncio
+import contextlib
+import functools
 import os
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import aiofiles.tempfile
 from langchain_core.messages import HumanMessage
 
 from fashion_agent.config import file_logger, llm
@@ -42,11 +48,82 @@ def create_url_item(
     )
 
 
+def create_url_items_bulk(records: List[Dict[str, str]], now: Optional[str] = None) -> List[URLItem]:
+    """Create URLItems for a scrape batch that share one timestamp.
+    
+    Args:
+        records: Dicts with any of the create_url_item keyword fields
+        now: ISO timestamp to stamp on every item; defaults to the current time
+    """
+    scraped_at = now or datetime.now().isoformat()
+    return [
+        URLItem(
+            title=r.get("title", ""),
+            url=r.get("url", ""),
+            author=r.get("author", ""),
+            date=r.get("date", ""),
+            category=r.get("category", ""),
+            excerpt=r.get("excerpt", ""),
+            image_url=r.get("image_url", ""),
+            scraped_at=scraped_at
+        )
+        for r in records
+    ]
+
+
 # =========================
 # Video Generation Helpers
 # =========================
-# Video Generation Helpers
-# =========================
+
+# Remote outfit images are written to disk in chunks of this size
+_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Temp file suffix for downloaded images, keyed by response Content-Type
+_IMAGE_EXTENSIONS = {
+    'image/png': '.png',
+    'image/jpeg': '.jpg',
+    'image/jpg': '.jpg',
+    'image/webp': '.webp',
+    'image/gif': '.gif',
+}
+
+# Shared across make_video calls and Veo fallback downloads so they reuse pooled
+# TLS connections instead of opening a new session per request
+_HTTP_SESSION = None
+
+
+async def get_http_session():
+    """Return the shared aiohttp session, creating it on first use or after it was closed."""
+    global _HTTP_SESSION
+    if _HTTP_SESSION is None or _HTTP_SESSION.closed:
+        import aiohttp
+        _HTTP_SESSION = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=60),
+            connector=aiohttp.TCPConnector(limit=32, ttl_dns_cache=300)
+        )
+    return _HTTP_SESSION
+
+
+async def close_http_session() -> None:
+    """Close the shared aiohttp session; called from the server lifespan in webapp.py."""
+    global _HTTP_SESSION
+    if _HTTP_SESSION is not None and not _HTTP_SESSION.closed:
+        await _HTTP_SESSION.close()
+    _HTTP_SESSION = None
+
+
+@functools.cache
+def _load_vid_generator():
+    """Import the video generation stack (genai, OpenCV, MoviePy) on first use only."""
+    from ..utils.video_generation import vid_generator
+    return vid_generator
+
+
+def _remove_temp_file(path: str) -> None:
+    """Delete a temp file, ignoring one that is already gone."""
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(path)
+
 
 async def make_video(image_path: str) -> Dict[str, Any]:
     """
@@ -63,42 +140,46 @@ async def make_video(image_path: str) -> Dict[str, Any]:
         - error: str (if failed)
         - processing_time: float
     """
-    from ..utils.video_generation import vid_generator
-    import tempfile
-    import aiohttp
+    vid_generator = _load_vid_generator()
     
     actual_image_path = image_path
-    temp_file = None
+    temp_path = None
     
     # Handle remote URLs (e.g., Supabase)
     if image_path.startswith(('http://', 'https://')):
         file_logger.info(f"Downloading remote image from: {image_path}")
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(image_path) as response:
-                    if response.status != 200:
-                        return {
-                            "success": False,
-                            "output_path": None,
-                            "duration": 0.0,
-                            "error": f"Failed to download image: HTTP {response.status}",
-                            "processing_time": 0.5
-                        }
-                    
-                    # Get file extension from URL or default to .png
-                    ext = '.png'
-                    if '.' in image_path.split('/')[-1]:
-                        ext = '.' + image_path.split('/')[-1].split('.')[-1]
-                    
-                    # Create temp file
-                    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=ext)
-                    temp_file.write(await response.read())
-                    temp_file.close()
-                    actual_image_path = temp_file.name
-                    file_logger.info(f"Downloaded image to temp file: {actual_image_path}")
-                    
+            session = await get_http_session()
+            async with session.get(image_path) as response:
+                if response.status != 200:
+                    return {
+                        "success": False,
+                        "output_path": None,
+                        "duration": 0.0,
+                        "error": f"Failed to download image: HTTP {response.status}",
+                        "processing_time": 0.5
+                    }
+                
+                # Prefer the served Content-Type; the URL path (minus any signed-URL
+                # query string) is the fallback, then .png
+                content_type = response.headers.get('Content-Type', '').split(';', 1)[0].strip().lower()
+                ext = (_IMAGE_EXTENSIONS.get(content_type)
+                       or os.path.splitext(urlparse(image_path).path)[1]
+                       or '.png')
+                
+                # Stream into the temp file so the image is never held in memory whole
+                async with aiofiles.tempfile.NamedTemporaryFile("wb", delete=False, suffix=ext) as f:
+                    temp_path = f.name
+                    async for chunk in response.content.iter_chunked(_DOWNLOAD_CHUNK_SIZE):
+                        await f.write(chunk)
+                actual_image_path = temp_path
+                file_logger.info(f"Downloaded image to temp file: {actual_image_path}")
+                
         except Exception as e:
             file_logger.error(f"Failed to download remote image: {e}")
+            # A download that failed mid-stream leaves a partial temp file behind
+            if temp_path:
+                _remove_temp_file(temp_path)
             return {
                 "success": False,
                 "output_path": None,
@@ -120,9 +201,6 @@ async def make_video(image_path: str) -> Dict[str, Any]:
     try:
         output_path = await vid_generator(actual_image_path)
     except Exception as e:
-        # Clean up temp file if created
-        if temp_file and os.path.exists(temp_file.name):
-            os.unlink(temp_file.name)
         return {
             "success": False,
             "output_path": None,
@@ -130,10 +208,10 @@ async def make_video(image_path: str) -> Dict[str, Any]:
             "error": str(e),
             "processing_time": 0.5
         }
-    
-    # Clean up temp file if created
-    if temp_file and os.path.exists(temp_file.name):
-        os.unlink(temp_file.name)
+    finally:
+        # Clean up temp file if created
+        if temp_path:
+            _remove_temp_file(temp_path)
     
     if output_path is None or not os.path.exists(output_path):
         return {
@@ -168,14 +246,34 @@ def load_video_urls() -> list:
 # LLM Image Analysis
 # =========================
 
+# Caps concurrent vision calls so batches stay under the LLM rate limit
+_LLM_IMAGE_SEM = asyncio.Semaphore(8)
+
+
 async def analyze_image_with_llm(image_b64: str, mime: str, context: str) -> str:
     """Analyze image using LLM with vision capabilities."""
-    mime = mime or "image/png"
-    data_uri = f"data:{mime};base64,{image_b64}"
+    # Standard base64 image block: the payload is passed by reference instead of being
+    # copied into a data: URI that the Gemini adapter would only parse apart again
     content = [
         {"type": "text", "text": context},
-        {"type": "image_url", "image_url": data_uri},
+        {"type": "image", "base64": image_b64, "mime_type": mime or "image/png"},
     ]
     msg = HumanMessage(content=content)
     resp = await llm.ainvoke([msg])
     return getattr(resp, "content", str(resp))
+
+
+async def analyze_images_with_llm(items: List[Tuple[str, str, str]]) -> List[str]:
+    """Analyze several images concurrently.
+    
+    Args:
+        items: (image_b64, mime, context) tuples, one per image
+        
+    Returns:
+        Analysis text for each item, in input order
+    """
+    async def _analyze(image_b64: str, mime: str, context: str) -> str:
+        async with _LLM_IMAGE_SEM:
+            return await analyze_image_with_llm(image_b64, mime, context)
+    
+    return list(await asyncio.gather(*(_analyze(*item) for item in items)))
@@ -5,8 +5,9 @@ This module manages connections to MCP servers and retrieves tools for each agen
 """
 
 import asyncio
+import time
 import traceback
-from typing import Optional, List
+from typing import Any, Callable, Dict, Iterable, Optional, List, Tuple
 from langchain_mcp_adapters.client import MultiServerMCPClient
 
 from fashion_agent.config import (
@@ -33,6 +34,34 @@ MCP_CLIENT_OUTFIT: Optional[MultiServerMCPClient] = None
 MCP_CLIENT_TAVILY: Optional[MultiServerMCPClient] = None
 
 
+# =========================
+# Tool Cache
+# =========================
+
+# MCP servers expose a fixed tool set, so listings are reused instead of
+# re-fetched from the server on every agent build
+_TOOLS_CACHE_TTL = 300  # seconds
+_TOOLS_CACHE: Dict[str, Tuple[float, List]] = {}
+_IMAGE_TOOL_CACHE: Optional[Tuple[float, Any]] = None
+
+
+async def _get_cached_tools(key: str, client: MultiServerMCPClient) -> List:
+    """Return client.get_tools(), reusing a listing fetched within the TTL."""
+    cached = _TOOLS_CACHE.get(key)
+    if cached and time.monotonic() - cached[0] < _TOOLS_CACHE_TTL:
+        return cached[1]
+    tools = await client.get_tools()
+    _TOOLS_CACHE[key] = (time.monotonic(), tools)
+    return tools
+
+
+def invalidate_tool_cache() -> None:
+    """Drop cached tool listings so the next getter call re-fetches from the MCP servers."""
+    global _IMAGE_TOOL_CACHE
+    _TOOLS_CACHE.clear()
+    _IMAGE_TOOL_CACHE = None
+
+
 # =========================
 # MCP Client Getters
 # =========================
@@ -95,103 +124,88 @@ def get_mcp_tavily() -> Optional[MultiServerMCPClient]:
 # Tool Retrieval Functions
 # =========================
 
-async def get_scraper_tools() -> List:
-    """Get MCP tools for data collection agent.
+async def _get_tools(
+    label: str,
+    client_factory: Callable[[], Optional[MultiServerMCPClient]],
+    filter_names: Optional[Iterable[str]] = None,
+    fallback_to_all: bool = True
+) -> List:
+    """Shared tool retrieval for every agent's MCP client.
     
     MultiServerMCPClient.get_tools() automatically handles session management.
     Each tool invocation creates a fresh ClientSession internally.
+    
+    Args:
+        label: Tool set name, used as the cache key and in log messages
+        client_factory: MCP client getter; may return None for optional servers
+        filter_names: Tool names to keep, if configured
+        fallback_to_all: Return the unfiltered tools when the filter matches nothing
     """
     try:
-        file_logger.info("Getting tools from data collector MCP client...")
-        client = get_mcp_scrape()
+        client = client_factory()
+        if not client:
+            file_logger.warning(f"{label} MCP client not available - skipping {label} tools")
+            return []
         
-        # get_tools() handles session creation automatically - no need to call start()
-        tools = await client.get_tools()
-        file_logger.info(f"Retrieved {len(tools)} total tools from MCP")
+        tools = await _get_cached_tools(label, client)
+        file_logger.info(f"Retrieved {len(tools)} {label} tools from MCP")
         
         # Filter to specific tools if configured
-        filtered = [t for t in tools if getattr(t, "name", None) in SCRAPER_TOOL_NAMES]
-        file_logger.info(f"Filtered to {len(filtered)} scraper tools")
-        
-        result_tools = filtered or tools
-        file_logger.info(f"Returning {len(result_tools)} tools for data collector")
-        return result_tools
+        if filter_names:
+            filtered = [t for t in tools if getattr(t, "name", None) in filter_names]
+            file_logger.info(f"Filtered to {len(filtered)} {label} tools")
+            if filtered or not fallback_to_all:
+                tools = filtered
+        return tools
         
     except Exception as e:
-        file_logger.error(f"ERROR: Failed to get scraper tools: {e}")
-        file_logger.error(f"Scraper tools traceback: {traceback.format_exc()}")
+        file_logger.error(f"ERROR: Failed to get {label} tools: {e}")
+        file_logger.error(f"{label} tools traceback: {traceback.format_exc()}")
         file_logger.warning("Returning empty tools list as fallback")
         return []
 
 
+async def get_scraper_tools() -> List:
+    """Get MCP tools for data collection agent, filtered to SCRAPER_TOOL_NAMES when any match."""
+    return await _get_tools("scraper", get_mcp_scrape, SCRAPER_TOOL_NAMES)
+
+
 async def get_image_tools() -> List:
-    """Get MCP tools for content analyzer agent.
-    
-    MultiServerMCPClient.get_tools() automatically handles session management.
-    """
-    try:
-        client = get_mcp_image()
-        tools = await client.get_tools()
-        file_logger.info(f"Retrieved {len(tools)} image tools from MCP")
-        return tools
-    except Exception as e:
-        file_logger.error(f"ERROR: Failed to get image tools: {e}")
-        file_logger.warning("Returning empty tools list as fallback")
-        return []
+    """Get MCP tools for content analyzer agent."""
+    return await _get_tools("image", get_mcp_image)
 
 
 async def get_video_tools() -> List:
-    """Get MCP tools for video analyzer agent.
-    
-    MultiServerMCPClient.get_tools() automatically handles session management.
-    """
-    try:
-        file_logger.info("Getting tools from video analyzer MCP client...")
-        client = get_mcp_video()
-        
-        tools = await client.get_tools()
-        file_logger.info(f"Retrieved {len(tools)} video tools from MCP")
-        return tools
-
-    except Exception as e:
-        file_logger.error(f"ERROR: Failed to get video tools: {e}")
-        file_logger.error(f"Video tools traceback: {traceback.format_exc()}")
-        file_logger.warning("Returning empty tools list as fallback")
-        return []
+    """Get MCP tools for video analyzer agent."""
+    return await _get_tools("video", get_mcp_video)
 
 
 async def get_outfit_tools() -> List:
-    """Get MCP tools for outfit design agent.
-    
-    MultiServerMCPClient.get_tools() automatically handles session management.
-    """
-    try:
-        client = get_mcp_outfit()
-        if not client:
-            return []
-        tools = await client.get_tools()
-        file_logger.info(f"Retrieved {len(tools)} outfit design tools")
-        return tools
-    except Exception as e:
-        file_logger.warning(f"Failed to get outfit design tools: {e}")
-        return []
+    """Get MCP tools for outfit design agent."""
+    return await _get_tools("outfit", get_mcp_outfit)
 
 
 async def get_image_tool():
     """Get preferred image tool from content analyzer MCP client.
     
     MultiServerMCPClient.get_tools() automatically handles session management.
+    The resolved tool is cached for the same TTL as the tool listings.
     """
-    client = get_mcp_image()
-    tools = await client.get_tools()
+    global _IMAGE_TOOL_CACHE
+    if _IMAGE_TOOL_CACHE and time.monotonic() - _IMAGE_TOOL_CACHE[0] < _TOOLS_CACHE_TTL:
+        return _IMAGE_TOOL_CACHE[1]
     
-    by_name = {getattr(t, "name", ""): t for t in tools}
-    for name in IMAGE_TOOL_PREFERRED_NAMES:
-        if name in by_name:
-            return by_name[name]
+    client = get_mcp_image()
+    tools = await _get_cached_tools("image", client)
     
-    if tools:
-        return tools[0]
+    # Preferred names are few, so a direct scan with early exit beats building a name index
+    tool = next(
+        (t for name in IMAGE_TOOL_PREFERRED_NAMES for t in tools if getattr(t, "name", None) == name),
+        tools[0] if tools else None
+    )
+    if tool is not None:
+        _IMAGE_TOOL_CACHE = (time.monotonic(), tool)
+        return tool
     raise RuntimeError("No MCP image tool available. Ensure your Image MCP server is running and exposes a tool.")
 
 
@@ -201,24 +215,4 @@ async def get_tavily_tools() -> List:
     Returns tools like tavily-search and tavily-extract.
     Returns empty list if Tavily API key is not configured.
     """
-    try:
-        client = get_mcp_tavily()
-        if not client:
-            file_logger.warning("Tavily MCP client not available - skipping Tavily tools")
-            return []
-        
-        tools = await client.get_tools()
-        file_logger.info(f"Retrieved {len(tools)} tools from Tavily MCP")
-        
-        # Filter to specific tools if configured
-        if TAVILY_TOOL_NAMES:
-            filtered = [t for t in tools if getattr(t, "name", None) in TAVILY_TOOL_NAMES]
-            file_logger.info(f"Filtered to {len(filtered)} Tavily tools: {[getattr(t, 'name', '') for t in filtered]}")
-            return filtered
-        
-        return tools
-        
-    except Exception as e:
-        file_logger.error(f"Failed to get Tavily tools: {e}")
-        file_logger.error(f"Tavily tools traceback: {traceback.format_exc()}")
-        return []
+    return await _get_tools("tavily", get_mcp_tavily, TAVILY_TOOL_NAMES, fallback_to_all=False)
@@ -1,12 +1,21 @@
+import copy
+import functools
+import hashlib
+import mimetypes
+import mmap
 import os
-from typing import Dict, List, Optional
+import select as io_select
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional
 from decouple import config
-from sqlalchemy import create_engine, Column, String, JSON, text
+from sqlalchemy import create_engine, Column, String, JSON, Float, TIMESTAMP, text, cast, func, literal, select, delete, update, bindparam
+from sqlalchemy.dialects.postgresql import JSONB, insert as pg_insert
 from sqlalchemy.orm import declarative_base, sessionmaker, Session
-from sqlalchemy.exc import IntegrityError
 from supabase import create_client, Client
 import uuid
 import logging
+import threading
+import time
 from datetime import datetime
 config.search_path = os.path.dirname(os.path.abspath(__file__))
 # Configure logging
@@ -20,14 +29,129 @@ SUPABASE_KEY = config("SUPABASE_KEY", default="")
 SUPABASE_BUCKET = config("SUPABASE_BUCKET", default="outfits")
 SUPABASE_VIDEO_BUCKET = config("SUPABASE_VIDEO_BUCKET", default="videos")
 
+# Parallel Supabase uploads per batch, and tries per file before giving up
+UPLOAD_CONCURRENCY = config("UPLOAD_CONCURRENCY", default=6, cast=int)
+UPLOAD_ATTEMPTS = 2
+
+# Connection pool sizing; keep (pool_size + max_overflow) x worker processes below
+# the Postgres max_connections limit (100 by default)
+DB_POOL_SIZE = config("DB_POOL_SIZE", default=20, cast=int)
+DB_MAX_OVERFLOW = config("DB_MAX_OVERFLOW", default=30, cast=int)
+DB_POOL_TIMEOUT = config("DB_POOL_TIMEOUT", default=30, cast=int)
+
 
 # Initialize SQLAlchemy with 2.0 style
 Base = declarative_base()
-engine = create_engine(DB_URL, pool_pre_ping=True, pool_recycle=300)
+engine = create_engine(
+    DB_URL,
+    pool_pre_ping=True,
+    pool_recycle=300,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-# Initialize Supabase client
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+
+@functools.lru_cache(maxsize=1)
+def get_supabase() -> Client:
+    """Get the Supabase client, created on first use"""
+    return create_client(SUPABASE_URL, SUPABASE_KEY)
+
+
+# Short-lived in-process cache of get_media_processing_record results, keyed by
+# record ID; writes evict their entry here and, via NOTIFY, in other processes.
+# Records are deep-copied in and out since their JSONB fields are nested lists/dicts.
+_RECORD_CACHE_TTL = 30  # seconds
+_RECORD_CACHE_MAXSIZE = 1024
+_record_cache: Dict[str, tuple] = {}
+_record_cache_lock = threading.RLock()
+
+
+def _cache_get_record(record_id: str) -> Optional[Dict]:
+    """Return a cached record dict if it is still fresh"""
+    with _record_cache_lock:
+        entry = _record_cache.get(record_id)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] >= _RECORD_CACHE_TTL:
+            del _record_cache[record_id]
+            return None
+        return copy.deepcopy(entry[1])
+
+
+def _cache_put_record(record_id: str, record: Dict) -> None:
+    """Store a record dict, evicting the oldest entry when the cache is full"""
+    _start_invalidation_listener()
+    with _record_cache_lock:
+        if record_id not in _record_cache and len(_record_cache) >= _RECORD_CACHE_MAXSIZE:
+            del _record_cache[next(iter(_record_cache))]
+        _record_cache[record_id] = (time.monotonic(), copy.deepcopy(record))
+
+
+def invalidate_record_cache(record_id: Optional[str] = None) -> None:
+    """Evict one record from the read cache, or all records when no ID is given"""
+    with _record_cache_lock:
+        if record_id is None:
+            _record_cache.clear()
+        else:
+            _record_cache.pop(record_id, None)
+
+
+# Writes in any process publish the record ID here so every process's read cache
+# drops its copy immediately instead of serving it until the TTL expires
+_INVALIDATION_CHANNEL = "media_processing_changed"
+_NOTIFY_STMT = text(f"SELECT pg_notify('{_INVALIDATION_CHANNEL}', :record_id)")
+_listener_started = False
+
+
+def _notify_record_changed(db: Session, record_id: str) -> None:
+    """Queue a cache invalidation for record_id; Postgres delivers it when the transaction commits"""
+    db.execute(_NOTIFY_STMT, {"record_id": record_id})
+
+
+def _listen_for_invalidations() -> None:
+    """LISTEN on the invalidation channel and evict announced records, reconnecting on errors"""
+    while True:
+        conn = None
+        try:
+            conn = engine.raw_connection()
+            conn.detach()  # Held for the life of the process, so keep it out of the pool
+            dbapi_conn = conn.driver_connection
+            dbapi_conn.autocommit = True
+            with dbapi_conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {_INVALIDATION_CHANNEL}")
+            while True:
+                if io_select.select([dbapi_conn], [], [], 5.0)[0]:
+                    dbapi_conn.poll()
+                    while dbapi_conn.notifies:
+                        invalidate_record_cache(dbapi_conn.notifies.pop(0).payload)
+        except Exception as e:
+            logger.warning(f"Record cache invalidation listener failed, reconnecting: {str(e)}")
+            # Updates may have been missed while disconnected
+            invalidate_record_cache()
+            time.sleep(5)
+        finally:
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+
+
+def _start_invalidation_listener() -> None:
+    """Start the LISTEN thread once per process, the first time a record is cached"""
+    global _listener_started
+    if _listener_started:
+        return
+    with _record_cache_lock:
+        if not _listener_started:
+            threading.Thread(
+                target=_listen_for_invalidations,
+                name="record-cache-invalidation",
+                daemon=True
+            ).start()
+            _listener_started = True
 
 
 class MediaProcessing(Base):
@@ -41,32 +165,148 @@ class MediaProcessing(Base):
     final_report = Column(JSON, nullable=True)
     outfit_generation = Column(JSON, nullable=True)
     video_generation = Column(JSON, nullable=True)
-    outfit_image_urls = Column(JSON, nullable=True)  # Store URLs as JSON array
-    video_urls = Column(JSON, nullable=True)  # Store video URLs as JSON array
-    created_at = Column(String, default=lambda: datetime.now().isoformat())
-    updated_at = Column(String, default=lambda: datetime.now().isoformat(), onupdate=lambda: datetime.now().isoformat())
+    outfit_image_urls = Column(JSONB, nullable=True)  # Store URLs as JSONB array (appended server-side)
+    video_urls = Column(JSONB, nullable=True)  # Store video URLs as JSONB array (appended server-side)
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class VideoCache(Base):
+    """SQLAlchemy model mapping an outfit-image content hash to its generated video"""
+    __tablename__ = "video_cache"
+
+    content_hash = Column(String, primary_key=True)
+    video_url = Column(String, nullable=False)
+    video_duration = Column(Float, nullable=True)
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+
+
+class UploadCache(Base):
+    """SQLAlchemy model mapping uploaded file content (per bucket) to its public URL"""
+    __tablename__ = "upload_cache"
+
+    content_hash = Column(String, primary_key=True)  # "<bucket>:<blake2b of file bytes>"
+    public_url = Column(String, nullable=False)
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+
+
+# Columns whose type changed after tables were first created, as
+# (table, column, legacy information_schema data_type, new type, server default).
+# create_all leaves existing tables alone, so server defaults that replaced
+# Python-side defaults have to be added here too.
+_LEGACY_COLUMN_TYPES = (
+    ("media_processing", "outfit_image_urls", "json", "jsonb", None),
+    ("media_processing", "video_urls", "json", "jsonb", None),
+    ("media_processing", "created_at", "character varying", "timestamptz", "now()"),
+    ("media_processing", "updated_at", "character varying", "timestamptz", "now()"),
+    ("video_cache", "created_at", "character varying", "timestamptz", "now()"),
+    ("upload_cache", "created_at", "character varying", "timestamptz", "now()"),
+)
+
+
+def _migrate_legacy_columns() -> None:
+    """Convert columns still stored with their legacy type, e.g. json URL arrays and ISO text timestamps,
+    and add server defaults missing from tables created before they were introduced"""
+    with engine.begin() as conn:
+        for table, column, legacy_type, new_type, default in _LEGACY_COLUMN_TYPES:
+            info = conn.execute(
+                text(
+                    "SELECT data_type, column_default FROM information_schema.columns "
+                    "WHERE table_name = :table AND column_name = :column"
+                ),
+                {"table": table, "column": column}
+            ).first()
+            if info is None:
+                continue
+            if info.data_type == legacy_type:
+                conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE {new_type} USING {column}::{new_type}"))
+                logger.info(f"Migrated {table}.{column} to {new_type}")
+            if default is not None and info.column_default is None:
+                conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN {column} SET DEFAULT {default}"))
+                logger.info(f"Set default {default} on {table}.{column}")
 
 
 def init_db():
     """Initialize database tables"""
     try:
         Base.metadata.create_all(bind=engine)
+        _migrate_legacy_columns()
         logger.info("Database tables initialized successfully")
+        logger.info(f"Database pool: {engine.pool.status()}")
         return True
     except Exception as e:
         logger.error(f"Error initializing database: {str(e)}")
         return False
 
 
+# Tables are created on first DB use rather than at import
+_db_initialized = False
+_db_init_lock = threading.Lock()
+
+
+def _ensure_init() -> None:
+    """Run init_db once per process, on the first database session"""
+    global _db_initialized
+    if _db_initialized:
+        return
+    with _db_init_lock:
+        if not _db_initialized:
+            init_db()
+            _db_initialized = True
+
+
 def get_db_session() -> Session:
     """Get a database session"""
+    _ensure_init()
     return SessionLocal()
 
 
+def _upload_content_hash(file_path: str, bucket: str) -> str:
+    """Hash a file's bytes, scoped to the bucket it is uploaded to
+    
+    The file is memory-mapped so the hasher reads the page cache directly,
+    without copying the contents into Python buffers.
+    """
+    hasher = hashlib.blake2b()
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size:  # Zero-length files cannot be mapped
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                hasher.update(mm)
+    return f"{bucket}:{hasher.hexdigest()}"
+
+
+def _get_uploaded_url(content_hash: str) -> Optional[str]:
+    """Return the public URL of a previous upload with this content hash, if any"""
+    try:
+        with get_db_session() as db:
+            entry = db.get(UploadCache, content_hash)
+            return entry.public_url if entry else None
+    except Exception as e:
+        logger.error(f"Error reading upload cache: {str(e)}")
+        return None
+
+
+def _put_uploaded_url(content_hash: str, public_url: str) -> None:
+    """Remember an upload's public URL; the first writer wins on concurrent uploads"""
+    try:
+        stmt = pg_insert(UploadCache.__table__).values(
+            content_hash=content_hash,
+            public_url=public_url
+        ).on_conflict_do_nothing(index_elements=["content_hash"])
+        with get_db_session() as db:
+            db.execute(stmt)
+            db.commit()
+    except Exception as e:
+        logger.error(f"Error writing upload cache: {str(e)}")
+
+
 def upload_to_supabase(file_path: str, file_name: Optional[str] = None, bucket: Optional[str] = None) -> Optional[str]:
     """
     Upload a file to Supabase storage and return the public URL
     
+    Files whose content was already uploaded to the same bucket are not re-uploaded;
+    the earlier public URL is returned instead.
+    
     Args:
         file_path: Path to the file to upload
         file_name: Optional custom name for the file in storage
@@ -89,14 +329,24 @@ def upload_to_supabase(file_path: str, file_name: Optional[str] = None, bucket:
             # Default to images bucket
             bucket = SUPABASE_BUCKET
             
+        # Identical content already uploaded to this bucket is served from its existing URL
+        content_hash = _upload_content_hash(file_path, bucket)
+        cached_url = _get_uploaded_url(content_hash)
+        if cached_url:
+            logger.info(f"Reusing existing upload for {file_path}: {cached_url}")
+            return cached_url
+            
         # Generate unique path to avoid conflicts
         unique_path = f"{datetime.now().strftime('%Y/%m/%d')}/{uuid.uuid4()}-{file_name}"
         
-        # Upload file to Supabase
+        # Upload file to Supabase; the open handle is streamed as a multipart file
+        # part, so the file is never read into memory whole
+        content_type = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
         with open(file_path, 'rb') as f:
-            result = supabase.storage.from_(bucket).upload(
+            result = get_supabase().storage.from_(bucket).upload(
                 path=unique_path,
-                file=f
+                file=f,
+                file_options={"content-type": content_type}
             )
             
         if result is None:
@@ -104,8 +354,9 @@ def upload_to_supabase(file_path: str, file_name: Optional[str] = None, bucket:
             return None
             
         # Get public URL
-        public_url = supabase.storage.from_(bucket).get_public_url(unique_path)
+        public_url = get_supabase().storage.from_(bucket).get_public_url(unique_path)
         logger.info(f"File uploaded successfully to {bucket}: {public_url}")
+        _put_uploaded_url(content_hash, public_url)
         return public_url
         
     except Exception as e:
@@ -141,6 +392,27 @@ def upload_video_to_supabase(file_path: str, file_name: Optional[str] = None) ->
     return upload_to_supabase(file_path, file_name, SUPABASE_VIDEO_BUCKET)
 
 
+def _upload_with_retry(upload_fn: Callable[[str], Optional[str]], file_path: str) -> Optional[str]:
+    """Upload one file, retrying a failed upload up to UPLOAD_ATTEMPTS times in total"""
+    for attempt in range(UPLOAD_ATTEMPTS):
+        url = upload_fn(file_path)
+        if url or not os.path.exists(file_path):
+            return url
+        if attempt < UPLOAD_ATTEMPTS - 1:
+            logger.warning(f"Retrying upload of {file_path} (attempt {attempt + 2}/{UPLOAD_ATTEMPTS})")
+    return None
+
+
+def _upload_many(upload_fn: Callable[[str], Optional[str]], file_paths: List[str]) -> List[str]:
+    """Upload files concurrently on a bounded thread pool, keeping input order and dropping failures"""
+    if not file_paths:
+        return []
+    workers = min(UPLOAD_CONCURRENCY, len(file_paths))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="supabase-upload") as ex:
+        results = list(ex.map(lambda path: _upload_with_retry(upload_fn, path), file_paths))
+    return [url for url in results if url]
+
+
 def upload_multiple_images(file_paths: List[str]) -> List[str]:
     """
     Upload multiple image files to Supabase and return their URLs
@@ -151,12 +423,7 @@ def upload_multiple_images(file_paths: List[str]) -> List[str]:
     Returns:
         List of public URLs of the uploaded images
     """
-    urls = []
-    for file_path in file_paths:
-        url = upload_image_to_supabase(file_path)
-        if url:
-            urls.append(url)
-    return urls
+    return _upload_many(upload_image_to_supabase, file_paths)
 
 
 def upload_multiple_videos(file_paths: List[str]) -> List[str]:
@@ -169,12 +436,7 @@ def upload_multiple_videos(file_paths: List[str]) -> List[str]:
     Returns:
         List of public URLs of the uploaded videos
     """
-    urls = []
-    for file_path in file_paths:
-        url = upload_video_to_supabase(file_path)
-        if url:
-            urls.append(url)
-    return urls
+    return _upload_many(upload_video_to_supabase, file_paths)
 
 
 def create_media_processing_record(
@@ -210,39 +472,43 @@ def create_media_processing_record(
         if record_id is None:
             record_id = str(uuid.uuid4())
             
-        # Check if record with this ID already exists
-        with get_db_session() as db:
-            existing_record = db.query(MediaProcessing).filter(MediaProcessing.id == record_id).first()
-            if existing_record:
-                logger.error(f"Record with ID {record_id} already exists")
-                return None
+        table = MediaProcessing.__table__
         
-        # Upload outfit images if provided
-        outfit_image_urls = []
-        if outfit_image_paths:
-            outfit_image_urls = upload_multiple_images(outfit_image_paths)
-            
-        # Upload videos if provided
-        video_urls = []
-        if video_paths:
-            video_urls = upload_multiple_videos(video_paths)
-            
-        # Create new record
+        # Claim the ID atomically; RETURNING yields nothing when the ID is already taken,
+        # so that case is detected in one round trip and before any upload starts
+        claim_stmt = pg_insert(table).values(
+            id=record_id,  # Use the provided or generated ID
+            data_collector=data_collector,
+            video_analyzer=video_analyzer,
+            content_analysis=content_analysis,
+            final_report=final_report,
+            outfit_generation=outfit_generation,
+            video_generation=video_generation,
+            outfit_image_urls=[],
+            video_urls=[]
+        ).on_conflict_do_nothing(index_elements=[table.c.id]).returning(table.c.id)
         with get_db_session() as db:
-            new_record = MediaProcessing(
-                id=record_id,  # Use the provided or generated ID
-                data_collector=data_collector,
-                video_analyzer=video_analyzer,
-                content_analysis=content_analysis,
-                final_report=final_report,
-                outfit_generation=outfit_generation,
-                video_generation=video_generation,
-                outfit_image_urls=outfit_image_urls,
-                video_urls=video_urls
-            )
-            
-            db.add(new_record)
+            created_id = db.execute(claim_stmt).scalar_one_or_none()
             db.commit()
+        if created_id is None:
+            logger.error(f"Record with ID {record_id} already exists")
+            return None
+        
+        # Upload outfit images and videos concurrently
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="media-create") as ex:
+            images_future = ex.submit(upload_multiple_images, outfit_image_paths or [])
+            videos_future = ex.submit(upload_multiple_videos, video_paths or [])
+            outfit_image_urls = images_future.result()
+            video_urls = videos_future.result()
+        
+        if outfit_image_urls or video_urls:
+            with get_db_session() as db:
+                db.execute(
+                    update(table)
+                    .where(table.c.id == record_id)
+                    .values(outfit_image_urls=outfit_image_urls, video_urls=video_urls)
+                )
+                db.commit()
         
         logger.info(f"Created new media processing record with ID: {record_id}")
         return record_id
@@ -252,6 +518,12 @@ def create_media_processing_record(
         return None
 
 
+def _json_array_append(column, values: List[str]):
+    """SQL expression appending values to a JSONB array column server-side (NULL counts as empty)"""
+    existing = func.coalesce(column, cast(literal("[]"), JSONB))
+    return existing.op("||")(literal(values, type_=JSONB))
+
+
 def update_media_processing_record(
     record_id: str,
     data_collector: Optional[Dict] = None,
@@ -284,76 +556,75 @@ def update_media_processing_record(
     Returns:
         True if update successful, False otherwise
     """
-    max_retries = 3
-    for attempt in range(max_retries):
-        try:
-            with get_db_session() as db:
-                record = db.query(MediaProcessing).filter(MediaProcessing.id == record_id).first()
-                
-                if not record:
-                    logger.info(f"Record with ID {record_id} not found, creating new record")
-                    # Create a new record if it doesn't exist with empty fields
-                    record = MediaProcessing(id=record_id)
-                    db.add(record)
-                    # Flush to detect IntegrityError from concurrent inserts
-                    try:
-                        db.flush()
-                    except IntegrityError:
-                        # Another process created the record concurrently, rollback and retry
-                        db.rollback()
-                        logger.warning(f"Concurrent insert detected for record {record_id}, retrying (attempt {attempt + 1}/{max_retries})")
-                        continue
-                    
-                # Update JSON fields if provided
-                if data_collector is not None:
-                    record.data_collector = data_collector
-                if video_analyzer is not None:
-                    record.video_analyzer = video_analyzer
-                if content_analysis is not None:
-                    record.content_analysis = content_analysis
-                if final_report is not None:
-                    record.final_report = final_report
-                if outfit_generation is not None:
-                    record.outfit_generation = outfit_generation
-                if video_generation is not None:
-                    record.video_generation = video_generation
-                    
-                # Handle outfit images
-                if outfit_image_paths:
-                    new_urls = upload_multiple_images(outfit_image_paths)
-                    if new_urls:
-                        if append_images and record.outfit_image_urls:
-                            record.outfit_image_urls.extend(new_urls)
-                        else:
-                            record.outfit_image_urls = new_urls
-                            
-                # Handle videos
-                if video_paths:
-                    new_urls = upload_multiple_videos(video_paths)
-                    if new_urls:
-                        if append_videos and record.video_urls:
-                            record.video_urls.extend(new_urls)
-                        else:
-                            record.video_urls = new_urls
-                            
-                record.updated_at = datetime.now().isoformat()
-                db.commit()
-            
-            logger.info(f"Updated media processing record with ID: {record_id}")
-            return True
-            
-        except IntegrityError as e:
-            # This shouldn't happen after the flush() retry logic, but handle it anyway
-            logger.error(f"IntegrityError updating media processing record (attempt {attempt + 1}/{max_retries}): {str(e)}")
-            if attempt < max_retries - 1:
-                continue
-            return False
-        except Exception as e:
-            logger.error(f"Error updating media processing record: {str(e)}")
-            return False
+    # JSON columns to set; None means leave the stored value untouched
+    fields = {
+        name: value
+        for name, value in (
+            ("data_collector", data_collector),
+            ("video_analyzer", video_analyzer),
+            ("content_analysis", content_analysis),
+            ("final_report", final_report),
+            ("outfit_generation", outfit_generation),
+            ("video_generation", video_generation),
+        )
+        if value is not None
+    }
     
-    logger.error(f"Failed to update record {record_id} after {max_retries} attempts")
-    return False
+    # Nothing to write: skip the round trip instead of only bumping updated_at
+    if not fields and not outfit_image_paths and not video_paths:
+        logger.info(f"No changes for media processing record {record_id}, skipping update")
+        return True
+    
+    # Upload before touching the DB so no connection is held during network I/O
+    new_image_urls = upload_multiple_images(outfit_image_paths) if outfit_image_paths else []
+    new_video_urls = upload_multiple_videos(video_paths) if video_paths else []
+    
+    try:
+        table = MediaProcessing.__table__
+        insert_values = dict(fields, id=record_id)
+        update_values = dict(fields, updated_at=func.now())
+        
+        # Handle outfit images
+        if new_image_urls:
+            insert_values["outfit_image_urls"] = new_image_urls
+            update_values["outfit_image_urls"] = (
+                _json_array_append(table.c.outfit_image_urls, new_image_urls) if append_images else new_image_urls
+            )
+            
+        # Handle videos
+        if new_video_urls:
+            insert_values["video_urls"] = new_video_urls
+            update_values["video_urls"] = (
+                _json_array_append(table.c.video_urls, new_video_urls) if append_videos else new_video_urls
+            )
+        
+        # Single atomic statement: creates the record if missing, otherwise updates it
+        # in place, so concurrent writers cannot race on the create path
+        stmt = pg_insert(table).values(**insert_values).on_conflict_do_update(
+            index_elements=[table.c.id],
+            set_=update_values
+        )
+        with get_db_session() as db:
+            db.execute(stmt)
+            _notify_record_changed(db, record_id)
+            db.commit()
+        invalidate_record_cache(record_id)
+        
+        logger.info(f"Updated media processing record with ID: {record_id}")
+        return True
+        
+    except Exception as e:
+        logger.error(f"Error updating media processing record: {str(e)}")
+        return False
+
+
+# Built once so every call reuses the same statement (and its compiled-SQL cache entry)
+_GET_RECORD_STMT = select(MediaProcessing.__table__).where(
+    MediaProcessing.__table__.c.id == bindparam("record_id")
+)
+_DELETE_RECORD_STMT = delete(MediaProcessing.__table__).where(
+    MediaProcessing.__table__.c.id == bindparam("record_id")
+)
 
 
 # Specialized update functions for individual columns
@@ -382,9 +653,19 @@ def update_outfit_generation(record_id: str, data: Dict) -> bool:
     return update_media_processing_record(record_id, outfit_generation=data)
 
 
-def update_video_generation(record_id: str, data: Dict) -> bool:
-    """Update only the video_generation column for a specific record"""
-    return update_media_processing_record(record_id, video_generation=data)
+def update_video_generation(
+    record_id: str,
+    data: Dict,
+    video_paths: Optional[List[str]] = None,
+    append: bool = True
+) -> bool:
+    """Update the video_generation column, and optionally video_urls, in a single transaction"""
+    return update_media_processing_record(
+        record_id,
+        video_generation=data,
+        video_paths=video_paths,
+        append_videos=append
+    )
 
 
 def update_outfit_images(record_id: str, image_paths: List[str], append: bool = False) -> bool:
@@ -409,35 +690,34 @@ def get_media_processing_record(record_id: str) -> Optional[Dict]:
     """
     Get a media processing record by ID
     
+    Reads are served from a short TTL cache that this module's writes invalidate.
+    
     Args:
         record_id: ID of the record to retrieve
         
     Returns:
         Dictionary representation of the record or None if not found
     """
+    cached = _cache_get_record(record_id)
+    if cached is not None:
+        return cached
+    
     try:
         with get_db_session() as db:
-            record = db.query(MediaProcessing).filter(MediaProcessing.id == record_id).first()
+            # Plain row mapping: no ORM object is built just to be copied into a dict
+            row = db.execute(_GET_RECORD_STMT, {"record_id": record_id}).mappings().one_or_none()
             
-            if not record:
-                logger.error(f"Record with ID {record_id} not found")
-                return None
-                
-            # Convert to dictionary
-            result = {
-                "id": record.id,
-                "data_collector": record.data_collector,
-                "video_analyzer": record.video_analyzer,
-                "content_analysis": record.content_analysis,
-                "final_report": record.final_report,
-                "outfit_generation": record.outfit_generation,
-                "video_generation": record.video_generation,
-                "outfit_image_urls": record.outfit_image_urls,
-                "video_urls": record.video_urls,
-                "created_at": record.created_at,
-                "updated_at": record.updated_at
-            }
+        if row is None:
+            logger.error(f"Record with ID {record_id} not found")
+            return None
+            
+        # Convert to dictionary
+        result = dict(row)
+        for key in ("created_at", "updated_at"):
+            if result[key] is not None:
+                result[key] = result[key].isoformat()
         
+        _cache_put_record(record_id, result)
         return result
         
     except Exception as e:
@@ -445,6 +725,49 @@ def get_media_processing_record(record_id: str) -> Optional[Dict]:
         return None
 
 
+def get_video_by_hash(content_hash: str) -> Optional[Dict]:
+    """
+    Look up a previously generated video by the content hash of its input image
+    
+    Args:
+        content_hash: Hash of the outfit image bytes and generator version
+        
+    Returns:
+        Dictionary with video_url and video_duration, or None on a miss
+    """
+    try:
+        with get_db_session() as db:
+            entry = db.get(VideoCache, content_hash)
+            if not entry:
+                return None
+            return {"video_url": entry.video_url, "video_duration": entry.video_duration or 0.0}
+    except Exception as e:
+        logger.error(f"Error reading video cache: {str(e)}")
+        return None
+
+
+def put_video_by_hash(content_hash: str, video_url: str, video_duration: float = 0.0) -> bool:
+    """
+    Record the uploaded video URL for an input image content hash
+    
+    Args:
+        content_hash: Hash of the outfit image bytes and generator version
+        video_url: Public URL of the uploaded video
+        video_duration: Video duration in seconds
+        
+    Returns:
+        True if the entry was stored, False otherwise
+    """
+    try:
+        with get_db_session() as db:
+            db.merge(VideoCache(content_hash=content_hash, video_url=video_url, video_duration=video_duration))
+            db.commit()
+        return True
+    except Exception as e:
+        logger.error(f"Error writing video cache: {str(e)}")
+        return False
+
+
 def delete_media_processing_record(record_id: str) -> bool:
     """
     Delete a media processing record by ID
@@ -457,14 +780,14 @@ def delete_media_processing_record(record_id: str) -> bool:
     """
     try:
         with get_db_session() as db:
-            record = db.query(MediaProcessing).filter(MediaProcessing.id == record_id).first()
-            
-            if not record:
-                logger.error(f"Record with ID {record_id} not found")
-                return False
-                
-            db.delete(record)
+            result = db.execute(_DELETE_RECORD_STMT, {"record_id": record_id})
+            _notify_record_changed(db, record_id)
             db.commit()
+        invalidate_record_cache(record_id)
+        
+        if result.rowcount == 0:
+            logger.error(f"Record with ID {record_id} not found")
+            return False
         
         logger.info(f"Deleted media processing record with ID: {record_id}")
         return True
@@ -474,10 +797,33 @@ def delete_media_processing_record(record_id: str) -> bool:
         return False
 
 
+def iter_raw_query(query: str, params: Optional[Dict] = None, batch_size: int = 1000) -> Iterator[Dict]:
+    """
+    Execute a raw SQL query and yield rows as dictionaries while they arrive
+    
+    On Postgres this uses a server-side cursor, so memory stays bounded by
+    batch_size rows regardless of the result size. Errors propagate to the caller.
+    
+    Args:
+        query: SQL query to execute
+        params: Optional parameters for the query
+        batch_size: Rows fetched from the server per round trip
+        
+    Yields:
+        One dictionary per result row
+    """
+    _ensure_init()
+    with engine.connect().execution_options(stream_results=True, yield_per=batch_size) as conn:
+        for row in conn.execute(text(query), params or {}).mappings():
+            yield dict(row)
+
+
 def execute_raw_query(query: str, params: Optional[Dict] = None) -> List[Dict]:
     """
     Execute a raw SQL query and return results as a list of dictionaries
     
+    Use iter_raw_query to stream large results instead of materializing them.
+    
     Args:
         query: SQL query to execute
         params: Optional parameters for the query
@@ -488,18 +834,13 @@ def execute_raw_query(query: str, params: Optional[Dict] = None) -> List[Dict]:
     try:
         with get_db_session() as db:
             result = db.execute(text(query), params or {})
-            rows = result.fetchall()
             
-            # Convert to list of dictionaries
-            columns = result.keys()
-            results = [dict(zip(columns, row)) for row in rows]
+            # Convert to list of dictionaries straight from the cursor; RowMappings
+            # share one keymap, so there is no per-row zip over the column names
+            results = [dict(row) for row in result.mappings()]
         
         return results
         
     except Exception as e:
         logger.error(f"Error executing raw query: {str(e)}")
         return []
-
-
-# Initialize the database when the module is imported
-init_db()
@@ -6,31 +6,81 @@ using Google's Veo video generation API.
 """
 
 import asyncio
+import contextlib
+import functools
+import io
+import itertools
 import os
-import uuid
+import random
+import re
+import secrets
 import aiofiles
 import shutil
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any
+from typing import Any, List
 
 import cv2
 from google.genai import Client
 from google.genai import types
 from moviepy import VideoFileClip, concatenate_videoclips
+from moviepy.config import FFMPEG_BINARY
 from decouple import config
 
 from fashion_agent.config import file_logger
+from fashion_agent.tools.helpers import get_http_session
 
 
 # Configure environment
 config.search_path = os.path.dirname(os.path.abspath(__file__))
 _GOOGLE_API_ENV_KEYS = ("GoogleAPI", "GOOGLE_API_KEY")
 
+_VEO_MODEL = "veo-3.0-generate-001"
 
+# Last frames are handed to the next segment in memory; set to also keep them
+# under extracted_frames/ for inspection
+SAVE_DEBUG_FRAMES = config("SAVE_DEBUG_FRAMES", default=False, cast=bool)
+_FRAME_JPEG_QUALITY = 92
+
+_SEGMENT_DIR = Path("data/vid_segments")
+_OUTPUT_DIR = Path("videos")
+_FRAMES_DIR = Path("extracted_frames")
+_DIRS_READY = False
+
+# Per-process sequence for file names; the timestamp and random suffix keep
+# names unique across processes and restarts
+_FILE_COUNTER = itertools.count()
+
+# Backoff (seconds) for polling long-running Veo operations; jitter keeps
+# concurrent renders from polling in lockstep
+_POLL_INITIAL_DELAY = 1.0
+_POLL_MAX_DELAY = 10.0
+_POLL_BACKOFF = 1.5
+_POLL_JITTER = 0.25
+
+_DOWNLOAD_CHUNK_SIZE = 1 << 20
+_DOWNLOAD_TIMEOUT = 300  # seconds
+
+# Async GenAI client shared by every vid_generator call so connection pools and
+# auth state survive between runs; created on first use
+_AIO_CLIENT = None
+
+# Hardware H.264 encoders in preference order, with explicit write_videofile options for
+# each so none inherits MoviePy's libx264-oriented defaults. Only encoders with a preset
+# option are listed, since MoviePy's writer always passes "-preset".
+_HW_ENCODERS = (
+    ("h264_nvenc", {"preset": "p4", "ffmpeg_params": ["-rc", "vbr", "-cq", "23"]}),
+    ("h264_qsv", {"preset": "medium", "ffmpeg_params": ["-global_quality", "23"]}),
+)
+
+
+@functools.lru_cache(maxsize=1)
 def _get_google_api_key() -> str:
-    """Resolve the Google API key from common environment variables."""
+    """Resolve the Google API key from common environment variables, once per process."""
     for key in _GOOGLE_API_ENV_KEYS:
-        value = config(key, default=None)
+        value = os.environ.get(key) or config(key, default=None)
         if value:
             return value
     env_list = ", ".join(_GOOGLE_API_ENV_KEYS)
@@ -39,6 +89,23 @@ def _get_google_api_key() -> str:
     )
 
 
+def _get_aclient():
+    """Return the shared async GenAI client, creating it on first use."""
+    global _AIO_CLIENT
+    if _AIO_CLIENT is None:
+        file_logger.info("Initializing Google GenAI client...")
+        _AIO_CLIENT = Client(api_key=_get_google_api_key()).aio
+    return _AIO_CLIENT
+
+
+async def close_genai_client():
+    """Close the shared GenAI client; called from the server lifespan in webapp.py."""
+    global _AIO_CLIENT
+    if _AIO_CLIENT is not None:
+        await _AIO_CLIENT.aclose()
+    _AIO_CLIENT = None
+
+
 def ensure_dir(path):
     """Create directory if it doesn't exist."""
     os.makedirs(str(path), exist_ok=True)
@@ -49,6 +116,24 @@ async def async_ensure_dir(path):
     await asyncio.to_thread(os.makedirs, str(path), exist_ok=True)
 
 
+def _file_id():
+    """Return a short unique id for generated file names, e.g. 1760500000_0003_9f2c41ab."""
+    return f"{int(time.time())}_{next(_FILE_COUNTER):04x}_{secrets.token_hex(4)}"
+
+
+def _ensure_output_dirs():
+    """Create the segment, output and frame directories on first use.
+
+    makedirs is cheap and idempotent, so this runs inline once per process
+    rather than as a thread hop on every call.
+    """
+    global _DIRS_READY
+    if not _DIRS_READY:
+        for path in (_SEGMENT_DIR, _OUTPUT_DIR, _FRAMES_DIR):
+            path.mkdir(parents=True, exist_ok=True)
+        _DIRS_READY = True
+
+
 def blob_to_image(blob) -> "types.Image":
     """Convert a google.genai.types.Blob object into a google.genai.types.Image object."""
     if not isinstance(blob, types.Blob):
@@ -61,134 +146,192 @@ def blob_to_image(blob) -> "types.Image":
     )
 
 
-def extract_last_frame(video_path, output_image_path):
-    """Extract the last frame from a video and save it as an image."""
+def extract_last_frame(video_path, output_image_path=None):
+    """Extract the last frame from a video as JPEG bytes, optionally also saving it as an image.
+
+    Returns the encoded frame, or None if it could not be read.
+    """
     try:
         cap = cv2.VideoCapture(str(video_path))
-        
-        if not cap.isOpened():
-            file_logger.error(f"Could not open video {video_path}")
-            return False
-        
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        cap.set(cv2.CAP_PROP_POS_FRAMES, total_frames - 1)
-        ret, frame = cap.read()
-        
-        if ret:
-            cv2.imwrite(str(output_image_path), frame)
-            file_logger.info(f"Last frame extracted: {output_image_path}")
+        try:
+            if not cap.isOpened():
+                file_logger.error(f"Could not open video {video_path}")
+                return None
+
+            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            cap.set(cv2.CAP_PROP_POS_FRAMES, max(total_frames - 1, 0))
+
+            # grab() only advances the decoder; the frame is converted to BGR once, by retrieve()
+            ret = cap.grab()
+            if ret:
+                ret, frame = cap.retrieve()
+        finally:
             cap.release()
-            return True
-        else:
+
+        if not ret:
             file_logger.error("Could not read the last frame")
-            cap.release()
-            return False
-            
+            return None
+
+        ok, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, _FRAME_JPEG_QUALITY])
+        if not ok:
+            file_logger.error("Could not encode the last frame")
+            return None
+        frame_bytes = buf.tobytes()
+
+        if output_image_path is not None:
+            with open(output_image_path, "wb") as f:
+                f.write(frame_bytes)
+        file_logger.info(f"Last frame extracted: {output_image_path or video_path}")
+        return frame_bytes
+
     except Exception as e:
         file_logger.error(f"Error extracting last frame: {e}")
-        return False
+        return None
 
 
-def create_video_prompts():
-    """Create JSON-based prompts for the two video segments with detailed cuts."""
-    
-    prompts = {
-        "segment1": {
-            "duration": "80ms",
-            "description": "Model walks from back to front to display point where model presents outfit to audience",
-            "cuts": [
-                {
-                    "scene": "Runway entrance - model walking from background to foreground",
-                    "camera_position": "Behind model, elevated angle, tracking forward",
-                    "camera_movement": "Smooth forward tracking shot following model's walk",
-                    "duration": "20ms",
-                    "from": "0ms",
-                    "to": "20ms",
-                    "model": "Model enters from back of runway, walks confidently toward front display point with steady pace, maintaining professional posture"
-                },
-                {
-                    "scene": "Close-up details of outfit elements during walk",
-                    "camera_position": "Front position, multiple angle cuts",
-                    "camera_movement": "Quick zoom-in shots with rapid cuts between dress, shoes, and fabric details",
-                    "duration": "30ms",
-                    "from": "20ms",
-                    "to": "50ms",
-                    "model": "Model continues walking, dress fabric flows naturally, shoes create rhythmic steps, outfit details clearly visible in motion"
-                },
-                {
-                    "scene": "Left side perspective with face turn",
-                    "camera_position": "Left side of runway, medium distance",
-                    "camera_movement": "Full body shot transitioning to zoom-in from face to chest level",
-                    "duration": "20ms",
-                    "from": "50ms",
-                    "to": "70ms",
-                    "model": "Model reaches display point, Model maintains straight body posture then elegantly turns neck to left toward camera at left, makes eye contact with left-side audience while continuing forward movement"
-                },
-                {
-                    "scene": "Arrival at display point",
-                    "camera_position": "Front center of runway at display point",
-                    "camera_movement": "Zoom out shot revealing full model at display position",
-                    "duration": "10ms",
-                    "from": "70ms",
-                    "to": "80ms",
-                    "model": "Model still looking left, then gracefully turns head to face front, establishes eye contact with front audience, prepares for presentation"
-                }
-            ]
-        },
-        "segment2": {
-            "duration": "80ms",
-            "description": "Model presents outfit with elegance and professionalism at display point",
-            "cuts": [
-                {
-                    "scene": "Bottom to top reveal of complete outfit",
-                    "camera_position": "Front of model, low angle starting at feet level",
-                    "camera_movement": "Smooth vertical zoom-in moving from shoes upward to shoulders",
-                    "duration": "20ms",
-                    "from": "0ms",
-                    "to": "20ms",
-                    "model": "Model stands professionally at display point, maintains elegant posture while camera showcases outfit from shoes to shoulders"
-                },
-                {
-                    "scene": "Full body presentation with left turn",
-                    "camera_position": "Front center, medium distance",
-                    "camera_movement": "Zoom out shot capturing entire body",
-                    "duration": "10ms",
-                    "from": "20ms",
-                    "to": "30ms",
-                    "model": "Model slightly turns body to left, showcasing outfit's side profile and silhouette, maintains confident stance"
-                },
-                {
-                    "scene": "Makeup and facial features close-up",
-                    "camera_position": "Left side angle focusing on face",
-                    "camera_movement": "Zoom-in shot concentrating on facial features and makeup details",
-                    "duration": "20ms",
-                    "from": "30ms",
-                    "to": "50ms",
-                    "model": "Model looks toward left camera, blinks eyes naturally, displays makeup artistry including eye makeup, lip color, and facial contouring"
-                },
-                {
-                    "scene": "Professional pose presentation",
-                    "camera_position": "Front center, full view",
-                    "camera_movement": "Zoom out shot showing complete model",
-                    "duration": "15ms",
-                    "from": "50ms",
-                    "to": "65ms",
-                    "model": "Model turns back to face front audience, strikes professional pose showcasing outfit's front design and overall styling"
-                },
-                {
-                    "scene": "Elegant exit with fade transition",
-                    "camera_position": "Front center, wide angle",
-                    "camera_movement": "Zoom out shot with gradual fade out effect",
-                    "duration": "15ms",
-                    "from": "65ms",
-                    "to": "80ms",
-                    "model": "Model turns back gracefully, begins walking away from display point, maintains elegant posture during exit as scene fades out"
-                }
-            ]
-        }
+# Shot lists for the two runway segments; static, so built once at import
+_VIDEO_PROMPTS = {
+    "segment1": {
+        "duration": "80ms",
+        "description": "Model walks from back to front to display point where model presents outfit to audience",
+        "cuts": [
+            {
+                "scene": "Runway entrance - model walking from background to foreground",
+                "camera_position": "Behind model, elevated angle, tracking forward",
+                "camera_movement": "Smooth forward tracking shot following model's walk",
+                "duration": "20ms",
+                "from": "0ms",
+                "to": "20ms",
+                "model": "Model enters from back of runway, walks confidently toward front display point with steady pace, maintaining professional posture"
+            },
+            {
+                "scene": "Close-up details of outfit elements during walk",
+                "camera_position": "Front position, multiple angle cuts",
+                "camera_movement": "Quick zoom-in shots with rapid cuts between dress, shoes, and fabric details",
+                "duration": "30ms",
+                "from": "20ms",
+                "to": "50ms",
+                "model": "Model continues walking, dress fabric flows naturally, shoes create rhythmic steps, outfit details clearly visible in motion"
+            },
+            {
+                "scene": "Left side perspective with face turn",
+                "camera_position": "Left side of runway, medium distance",
+                "camera_movement": "Full body shot transitioning to zoom-in from face to chest level",
+                "duration": "20ms",
+                "from": "50ms",
+                "to": "70ms",
+                "model": "Model reaches display point, Model maintains straight body posture then elegantly turns neck to left toward camera at left, makes eye contact with left-side audience while continuing forward movement"
+            },
+            {
+                "scene": "Arrival at display point",
+                "camera_position": "Front center of runway at display point",
+                "camera_movement": "Zoom out shot revealing full model at display position",
+                "duration": "10ms",
+                "from": "70ms",
+                "to": "80ms",
+                "model": "Model still looking left, then gracefully turns head to face front, establishes eye contact with front audience, prepares for presentation"
+            }
+        ]
+    },
+    "segment2": {
+        "duration": "80ms",
+        "description": "Model presents outfit with elegance and professionalism at display point",
+        "cuts": [
+            {
+                "scene": "Bottom to top reveal of complete outfit",
+                "camera_position": "Front of model, low angle starting at feet level",
+                "camera_movement": "Smooth vertical zoom-in moving from shoes upward to shoulders",
+                "duration": "20ms",
+                "from": "0ms",
+                "to": "20ms",
+                "model": "Model stands professionally at display point, maintains elegant posture while camera showcases outfit from shoes to shoulders"
+            },
+            {
+                "scene": "Full body presentation with left turn",
+                "camera_position": "Front center, medium distance",
+                "camera_movement": "Zoom out shot capturing entire body",
+                "duration": "10ms",
+                "from": "20ms",
+                "to": "30ms",
+                "model": "Model slightly turns body to left, showcasing outfit's side profile and silhouette, maintains confident stance"
+            },
+            {
+                "scene": "Makeup and facial features close-up",
+                "camera_position": "Left side angle focusing on face",
+                "camera_movement": "Zoom-in shot concentrating on facial features and makeup details",
+                "duration": "20ms",
+                "from": "30ms",
+                "to": "50ms",
+                "model": "Model looks toward left camera, blinks eyes naturally, displays makeup artistry including eye makeup, lip color, and facial contouring"
+            },
+            {
+                "scene": "Professional pose presentation",
+                "camera_position": "Front center, full view",
+                "camera_movement": "Zoom out shot showing complete model",
+                "duration": "15ms",
+                "from": "50ms",
+                "to": "65ms",
+                "model": "Model turns back to face front audience, strikes professional pose showcasing outfit's front design and overall styling"
+            },
+            {
+                "scene": "Elegant exit with fade transition",
+                "camera_position": "Front center, wide angle",
+                "camera_movement": "Zoom out shot with gradual fade out effect",
+                "duration": "15ms",
+                "from": "65ms",
+                "to": "80ms",
+                "model": "Model turns back gracefully, begins walking away from display point, maintains elegant posture during exit as scene fades out"
+            }
+        ]
     }
-    
-    return prompts
+}
+
+
+def create_video_prompts():
+    """Return the JSON-based prompts for the two video segments with detailed cuts."""
+    return _VIDEO_PROMPTS
+
+
+# Fixed sections of every narrative prompt
+_NARRATIVE_PREAMBLE = (
+    "Lighting: Runway spotlights with dramatic shadows; maintain high-fashion editorial mood.\n"
+    "Cinematography notes: Shallow depth of field on key cuts; seamless grading with rich contrast and enhanced saturation.\n"
+    "Audio: Silent video with no audio track required.\n"
+    "\n"
+    "Shot-by-shot (follow exact timestamps & cuts):\n"
+)
+_NARRATIVE_EDITORIAL_NOTES = (
+    "Editorial notes:\n"
+    "- Use hard cuts where indicated; preserve continuity across adjacent cuts.\n"
+    "- Include zoom-ins and zoom-outs exactly at the timestamps listed.\n"
+    "- When the camera angle changes, adjust the camera angle rather than rotating the model. Generate a background if needed.\n"
+    "- Maintain color continuity and grading across the timeline; favor high-fashion contrast and saturation.\n"
+    "- Prioritize face & outfit sharpness for closeups; allow background blur for editorial depth.\n"
+    "- Keep total segment duration equal to the specified duration and match cuts precisely for frame-accurate editing.\n"
+    "- Generate silent video without audio track."
+)
+
+# (keywords, render note) pairs; keywords are substring-matched against each cut's scene and action
+_RENDER_NOTES = (
+    (
+        ("face", "makeup", "eye", "lip", "skin", "cheek", "blink"),
+        "  Render note: prioritize skin texture, eye/lip detail, highlight/shimmer, and natural grain for closeups.\n",
+    ),
+    (
+        ("fabric", "weave", "print", "texture", "dress", "outfit", "cloth"),
+        "  Render note: include fabric detail with shallow depth-of-field and crisp texture capture.\n",
+    ),
+    (
+        ("shoe", "step", "hem", "hands", "accessory", "ring", "bracelet", "bag"),
+        "  Render note: emphasize movement & tactile detail with precise focus.\n",
+    ),
+)
+
+# One precompiled alternation per note: a single C-level scan of the cut text
+# instead of a Python-level substring test per keyword
+_RENDER_NOTE_PATTERNS = tuple(
+    (re.compile("|".join(map(re.escape, keywords))), note) for keywords, note in _RENDER_NOTES
+)
 
 
 def json_to_narrative_prompt(prompt_data):
@@ -196,18 +339,11 @@ def json_to_narrative_prompt(prompt_data):
     description = prompt_data.get("description", "").strip()
     total_duration = prompt_data.get("duration", "").strip()
     cuts = prompt_data.get("cuts", [])
- 
-    narrative_lines = []
-    header = f"{description} (Total Duration: {total_duration})"
-    narrative_lines.append(header)
-    narrative_lines.append("")
- 
-    narrative_lines.append("Lighting: Runway spotlights with dramatic shadows; maintain high-fashion editorial mood.")
-    narrative_lines.append("Cinematography notes: Shallow depth of field on key cuts; seamless grading with rich contrast and enhanced saturation.")
-    narrative_lines.append("Audio: Silent video with no audio track required.")
-    narrative_lines.append("")
- 
-    narrative_lines.append("Shot-by-shot (follow exact timestamps & cuts):")
+
+    buf = io.StringIO()
+    buf.write(f"{description} (Total Duration: {total_duration})\n\n")
+    buf.write(_NARRATIVE_PREAMBLE)
+
     for cut in cuts:
         time_range = f"{cut.get('from', '')} - {cut.get('to', '')}"
         scene = cut.get("scene", "").strip()
@@ -215,124 +351,254 @@ def json_to_narrative_prompt(prompt_data):
         camera_move = cut.get("camera_movement", "").strip()
         model_action = cut.get("model", "").strip()
         duration = cut.get("duration", "").strip()
- 
-        cut_desc = f"- {time_range} ({duration}) | Scene: {scene}"
-        narrative_lines.append(cut_desc)
-        narrative_lines.append(f"  Camera: {camera_pos} | Movement: {camera_move}")
-        narrative_lines.append(f"  Model Action: {model_action}")
- 
-        scene_lower = scene.lower()
-        model_lower = model_action.lower()
-        combined_text = f"{scene_lower} {model_lower}"
-        
-        if any(k in combined_text for k in ["face", "makeup", "eye", "lip", "skin", "cheek", "eyes", "blink"]):
-            narrative_lines.append("  Render note: prioritize skin texture, eye/lip detail, highlight/shimmer, and natural grain for closeups.")
-        if any(k in combined_text for k in ["fabric", "weave", "print", "texture", "dress", "outfit", "cloth"]):
-            narrative_lines.append("  Render note: include fabric detail with shallow depth-of-field and crisp texture capture.")
-        if any(k in combined_text for k in ["shoe", "step", "hem", "hands", "accessory", "ring", "bracelet", "bag", "shoes"]):
-            narrative_lines.append("  Render note: emphasize movement & tactile detail with precise focus.")
-        
-        narrative_lines.append("")
- 
-    narrative_lines.append("Editorial notes:")
-    narrative_lines.append("- Use hard cuts where indicated; preserve continuity across adjacent cuts.")
-    narrative_lines.append("- Include zoom-ins and zoom-outs exactly at the timestamps listed.")
-    narrative_lines.append("- When the camera angle changes, adjust the camera angle rather than rotating the model. Generate a background if needed.")
-    narrative_lines.append("- Maintain color continuity and grading across the timeline; favor high-fashion contrast and saturation.")
-    narrative_lines.append("- Prioritize face & outfit sharpness for closeups; allow background blur for editorial depth.")
-    narrative_lines.append("- Keep total segment duration equal to the specified duration and match cuts precisely for frame-accurate editing.")
-    narrative_lines.append("- Generate silent video without audio track.")
- 
-    narrative = "\n".join(narrative_lines).strip()
-    return narrative
- 
-
-async def generate_video_segment(client, prompt_data, image_blob, segment_name):
-    """Generate a single video segment using Google Veo API."""
-    
-    await asyncio.sleep(10)
-    
-    narrative_prompt = json_to_narrative_prompt(prompt_data)
-    
+
+        buf.write(
+            f"- {time_range} ({duration}) | Scene: {scene}\n"
+            f"  Camera: {camera_pos} | Movement: {camera_move}\n"
+            f"  Model Action: {model_action}\n"
+        )
+
+        combined_text = f"{scene} {model_action}".lower()
+        for pattern, note in _RENDER_NOTE_PATTERNS:
+            if pattern.search(combined_text):
+                buf.write(note)
+
+        buf.write("\n")
+
+    buf.write(_NARRATIVE_EDITORIAL_NOTES)
+    return buf.getvalue().strip()
+
+
+# Narrative prompts per segment, converted once instead of on every generation
+_NARRATIVE_PROMPTS = {name: json_to_narrative_prompt(data) for name, data in _VIDEO_PROMPTS.items()}
+
+
+async def submit_video(client, narrative_prompt, image, segment_name):
+    """Submit a Veo generation request for one segment and return the pending operation."""
     file_logger.info(f"Generating {segment_name}...")
-    operation = await client.models.generate_videos(
-        model="veo-3.0-generate-001",
+    return await client.models.generate_videos(
+        model=_VEO_MODEL,
         prompt=narrative_prompt,
-        image=image_blob,
+        image=image,
     )
 
-    while not operation.done:
-        file_logger.info("Waiting for video generation to complete...")
-        await asyncio.sleep(5)
-        operation = await client.operations.get(operation)
 
-    output_dir = "data/vid_segments"
-    await async_ensure_dir(output_dir)
+async def _cancel_operation(client, operation):
+    """Best-effort cancel of an abandoned Veo operation so its render is not left running."""
+    name = getattr(operation, "name", None)
+    cancel = getattr(client.operations, "cancel", None)
+    if cancel is None:
+        file_logger.warning(f"Abandoning Veo operation {name}; the installed SDK cannot cancel it")
+        return
+    try:
+        await cancel(operation)
+        file_logger.info(f"Cancelled Veo operation {name}")
+    except Exception as e:
+        file_logger.warning(f"Failed to cancel Veo operation {name}: {e}")
+
+
+async def poll_until_done(client, operation):
+    """Poll a Veo operation with exponential backoff until it completes.
 
-    file_name = f"{output_dir}/{str(uuid.uuid4())}_{segment_name}.mp4"
+    If polling is cancelled (caller timeout, batch teardown) or fails, the
+    pending operation is cancelled server-side before the error propagates.
+    """
+    delay = _POLL_INITIAL_DELAY
+    try:
+        while not operation.done:
+            file_logger.info("Waiting for video generation to complete...")
+            await asyncio.sleep(delay + random.uniform(0, _POLL_JITTER))
+            operation = await client.operations.get(operation)
+            delay = min(delay * _POLL_BACKOFF, _POLL_MAX_DELAY)
+    except (asyncio.CancelledError, Exception):
+        await asyncio.shield(_cancel_operation(client, operation))
+        raise
+    return operation
+
+
+async def _download_to_file(uri, file_name):
+    """Stream a remote video to disk chunk by chunk; returns False if the download fails."""
+    try:
+        import aiohttp
+        session = await get_http_session()
+        # Whole clips take longer than the shared session's 60s default
+        async with session.get(uri, timeout=aiohttp.ClientTimeout(total=_DOWNLOAD_TIMEOUT)) as resp:
+            resp.raise_for_status()
+            async with aiofiles.open(file_name, 'wb') as f:
+                async for chunk in resp.content.iter_chunked(_DOWNLOAD_CHUNK_SIZE):
+                    await f.write(chunk)
+        return True
+    except Exception as e:
+        file_logger.error(f"Fallback HTTP download failed: {e}")
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(file_name)
+        return False
+
+
+async def save_video(client, operation, segment_name):
+    """Download the video produced by a completed Veo operation and return its local path."""
+    _ensure_output_dirs()
+    file_name = f"{_SEGMENT_DIR}/{_file_id()}_{segment_name}.mp4"
     file_logger.info(f"Saving generated video to: {file_name}")
     video = operation.response.generated_videos[0]
 
     downloaded = await client.files.download(file=video.video)
 
+    # bytearray is written as-is; copying it into bytes would double peak memory
     video_bytes = None
     if isinstance(downloaded, (bytes, bytearray)):
-        video_bytes = bytes(downloaded)
+        video_bytes = downloaded
     elif hasattr(downloaded, "data"):
         video_bytes = getattr(downloaded, "data")
     elif hasattr(downloaded, "video_bytes"):
         video_bytes = getattr(downloaded, "video_bytes")
+
+    if video_bytes:
+        async with aiofiles.open(file_name, 'wb') as f:
+            await f.write(video_bytes)
     else:
         uri = getattr(video.video, "uri", None)
-        if uri:
-            try:
-                import aiohttp
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(uri) as resp:
-                        video_bytes = await resp.read()
-            except Exception as e:
-                file_logger.error(f"Fallback HTTP download failed: {e}")
-
-    if not video_bytes:
-        raise RuntimeError(
-            "Failed to obtain generated video bytes. The SDK returned a remote video reference; "
-            "use the return value from client.files.download or fetch the URI and save the bytes locally."
-        )
-
-    async with aiofiles.open(file_name, 'wb') as f:
-        await f.write(video_bytes)
+        if not uri or not await _download_to_file(uri, file_name):
+            raise RuntimeError(
+                "Failed to obtain generated video bytes. The SDK returned a remote video reference; "
+                "use the return value from client.files.download or fetch the URI and save the bytes locally."
+            )
     file_logger.info(f"Generated video saved to {file_name}")
 
     return file_name
 
 
-def patch_videos_with_moviepy(video_paths, output_path):
-    """Patch multiple videos together using MoviePy."""
-    
+async def generate_video_segment(client, narrative_prompt, image_blob, segment_name):
+    """Generate a single video segment using Google Veo API."""
+    operation = await submit_video(client, narrative_prompt, image_blob, segment_name)
+    operation = await poll_until_done(client, operation)
+    return await save_video(client, operation, segment_name)
+
+
+async def concat_videos_with_ffmpeg(video_paths, output_path):
+    """Join videos with ffmpeg's concat demuxer, copying streams without re-encoding.
+
+    Only works when every input shares codec, resolution and frame rate, which holds
+    for segments from the same Veo model. Returns False so the caller can fall back
+    to a MoviePy re-encode otherwise.
+    """
+    list_path = f"{output_path}.concat.txt"
     try:
-        file_logger.info("Loading video clips...")
-        clips = []
-        
+        entries = []
         for video_path in video_paths:
-            file_logger.info(f"Loading: {video_path}")
-            clip = VideoFileClip(str(video_path))
-            clip = clip.without_audio()
-            clips.append(clip)
-        
-        file_logger.info("Concatenating video clips...")
-        final_clip = concatenate_videoclips(clips, method="compose")
-        
+            escaped = os.path.abspath(str(video_path)).replace("'", "'\\''")
+            entries.append(f"file '{escaped}'\n")
+        async with aiofiles.open(list_path, 'w') as f:
+            await f.write("".join(entries))
+
+        file_logger.info(f"Concatenating {len(video_paths)} clips with ffmpeg stream copy: {output_path}")
+        proc = await asyncio.create_subprocess_exec(
+            FFMPEG_BINARY, "-y", "-loglevel", "error",
+            "-f", "concat", "-safe", "0", "-i", list_path,
+            "-c", "copy", "-an", str(output_path),
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        _, stderr = await proc.communicate()
+        if proc.returncode != 0:
+            file_logger.warning(f"ffmpeg concat failed ({proc.returncode}): {stderr.decode(errors='replace').strip()}")
+            return False
+
+        file_logger.info(f"Successfully created final video: {output_path}")
+        return True
+
+    except Exception as e:
+        file_logger.error(f"Error concatenating videos with ffmpeg: {e}")
+        return False
+    finally:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(list_path)
+
+
+@functools.cache
+def _detect_hw_encoder():
+    """Return (codec, write_videofile options) for the first hardware H.264 encoder ffmpeg offers, or None."""
+    try:
+        result = subprocess.run(
+            [FFMPEG_BINARY, "-hide_banner", "-encoders"],
+            capture_output=True, text=True, timeout=10, check=True
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        file_logger.warning(f"Could not list ffmpeg encoders: {e}")
+        return None
+
+    available = {fields[1] for fields in map(str.split, result.stdout.splitlines()) if len(fields) > 1}
+    for codec, options in _HW_ENCODERS:
+        if codec in available:
+            file_logger.info(f"Using hardware encoder {codec} for MoviePy re-encodes")
+            return codec, options
+    return None
+
+
+def _write_concatenated(clips, output_path):
+    """Concatenate loaded clips and encode the result (MoviePy's writer is not reentrant)."""
+    file_logger.info("Concatenating video clips...")
+    final_clip = concatenate_videoclips(clips, method="compose")
+    try:
         file_logger.info(f"Writing final video to: {output_path}")
+        hw_encoder = _detect_hw_encoder()
+        if hw_encoder:
+            codec, options = hw_encoder
+            try:
+                final_clip.write_videofile(
+                    str(output_path),
+                    audio=False,
+                    logger=None,
+                    codec=codec,
+                    **options
+                )
+                return
+            except Exception as e:
+                # ffmpeg can be built with an encoder whose hardware is missing at runtime
+                file_logger.warning(f"Hardware encode with {codec} failed, falling back to libx264: {e}")
+
         final_clip.write_videofile(
             str(output_path), 
             audio=False,
-            logger=None
+            logger=None,
+            threads=os.cpu_count() or 4,
+            preset="veryfast",
+            ffmpeg_params=["-crf", "23", "-movflags", "+faststart"]
         )
-        
+    finally:
         final_clip.close()
+
+
+def _load_clip(video_path):
+    """Open a clip for concatenation, dropping its audio track."""
+    file_logger.info(f"Loading: {video_path}")
+    return VideoFileClip(str(video_path)).without_audio()
+
+
+def _patch_videos_sync(video_paths, output_path):
+    """Load, concatenate and encode clips; runs in a worker thread."""
+    clips = []
+    try:
+        file_logger.info("Loading video clips...")
+        # Each open probes its file through an ffmpeg subprocess, so the opens run side by side
+        with ThreadPoolExecutor(max_workers=max(len(video_paths), 1)) as loader:
+            futures = [loader.submit(_load_clip, path) for path in video_paths]
+        clips = [future.result() for future in futures if future.exception() is None]
+        for future in futures:
+            if future.exception() is not None:
+                raise future.exception()
+
+        _write_concatenated(clips, output_path)
+    finally:
         for clip in clips:
             clip.close()
-        
+
+
+async def patch_videos_with_moviepy(video_paths, output_path):
+    """Patch multiple videos together using MoviePy."""
+    try:
+        # The encode itself runs in MoviePy's ffmpeg subprocess, so a thread is enough
+        await asyncio.to_thread(_patch_videos_sync, video_paths, output_path)
         file_logger.info(f"Successfully created final video: {output_path}")
         return True
         
@@ -369,27 +635,19 @@ async def vid_generator(initial_image_path):
     Returns:
         str: Path to generated video, or None if failed
     """
-    file_id = str(uuid.uuid4())
+    file_id = _file_id()
     
-    file_logger.info("Initializing Google GenAI client...")
-    aclient = Client(api_key=_get_google_api_key()).aio
+    aclient = _get_aclient()
     
-    output_dir = Path("videos")
-    await async_ensure_dir(output_dir)
-
-    frames_dir = Path("extracted_frames")
-    await async_ensure_dir(frames_dir)
-
-    async def read_image_bytes(path):
-        async with aiofiles.open(path, 'rb') as f:
-            return await f.read()
+    _ensure_output_dirs()
+    output_dir = _OUTPUT_DIR
+    frames_dir = _FRAMES_DIR
 
     file_logger.info(f"Loading initial image from: {initial_image_path}")
-    image_bytes = await read_image_bytes(initial_image_path)
-    image_blob = types.Part.from_bytes(data=image_bytes, mime_type='image/png')
-    image = blob_to_image(image_blob.inline_data)
+    async with aiofiles.open(initial_image_path, 'rb') as f:
+        image_bytes = await f.read()
+    image = types.Image(image_bytes=image_bytes, mime_type='image/png')
 
-    prompts = create_video_prompts()
     video_paths = []
 
     try:
@@ -397,36 +655,31 @@ async def vid_generator(initial_image_path):
         file_logger.info(f"=== Generating {segment_name} ===")
         video_path = await generate_video_segment(
             aclient,
-            prompts[segment_name],
+            _NARRATIVE_PROMPTS[segment_name],
             image,
             segment_name
         )
         video_paths.append(video_path)
         file_logger.info(f"{segment_name} completed: {video_path}")
 
-        last_frame_path = frames_dir / f"{segment_name}_last_frame.jpg"
-        last_frame_ok = await asyncio.to_thread(extract_last_frame, video_path, last_frame_path)
+        # The frame goes straight into the next request; it only touches disk when debugging
+        last_frame_path = frames_dir / f"{file_id}_{segment_name}_last_frame.jpg" if SAVE_DEBUG_FRAMES else None
+        last_frame = await asyncio.to_thread(extract_last_frame, video_path, last_frame_path)
         
-        if not last_frame_ok:
+        if not last_frame:
             final_video_path = output_dir / f"{file_id}_complete_runway_presentation.mp4"
             await asyncio.to_thread(move_file, video_path, final_video_path)
             file_logger.info(f"Video generated and saved to: {final_video_path}")
-            await aclient.aclose()
             return str(final_video_path)
 
-        file_logger.info("Waiting 10 seconds before generating segment 2...")
-        await asyncio.sleep(10)
-        
-        image_bytes = await read_image_bytes(last_frame_path)
-        image_blob = types.Part.from_bytes(data=image_bytes, mime_type='image/jpeg')
-        image2 = blob_to_image(image_blob.inline_data)
+        image2 = types.Image(image_bytes=last_frame, mime_type='image/jpeg')
         
         try:
             segment_name = "segment2"
             file_logger.info(f"=== Generating {segment_name} ===")
             video_path = await generate_video_segment(
                 aclient,
-                prompts[segment_name],
+                _NARRATIVE_PROMPTS[segment_name],
                 image2,
                 segment_name
             )
@@ -436,28 +689,50 @@ async def vid_generator(initial_image_path):
             final_video_path = output_dir / f"{file_id}_complete_runway_presentation.mp4"
             await asyncio.to_thread(move_file, video_paths[0], final_video_path)
             file_logger.info(f"Video generated and saved to: {final_video_path}")
-            await aclient.aclose()
             return str(final_video_path)
             
     except Exception as e:
         file_logger.error(f"Unable to generate video: {e}")
-        await aclient.aclose()
         return None
 
     final_video_path = output_dir / f"{file_id}_complete_runway_presentation.mp4"
     
     try:
-        patched = await asyncio.to_thread(patch_videos_with_moviepy, video_paths, final_video_path)
+        patched = await concat_videos_with_ffmpeg(video_paths, final_video_path)
+        if not patched:
+            file_logger.info("Falling back to MoviePy re-encode")
+            patched = await patch_videos_with_moviepy(video_paths, final_video_path)
     except Exception as exc:
-        file_logger.error(f"Error running video patch in thread: {exc}")
-        await aclient.aclose()
+        file_logger.error(f"Error running video patch: {exc}")
         return None
 
     if patched:
         file_logger.info(f"Complete runway video created: {final_video_path}")
-        await aclient.aclose()
         return str(final_video_path)
     else:
         file_logger.error("Failed to create final video")
-        await aclient.aclose()
         return None
+
+
+async def vid_generator_batch(image_paths: List[str], max_concurrency: int = 4) -> List[Any]:
+    """
+    Generate runway videos for several outfit images concurrently.
+    
+    Veo renders are dominated by server-side time, so up to ``max_concurrency``
+    of them run at once; the bound keeps the batch within the API quota.
+    
+    Args:
+        image_paths: Paths to the outfit images
+        max_concurrency: Maximum number of renders in flight
+        
+    Returns:
+        list: One entry per image, in input order: the video path, None if
+        generation failed, or the exception raised for that image
+    """
+    sem = asyncio.Semaphore(max_concurrency)
+
+    async def _one(image_path):
+        async with sem:
+            return await vid_generator(image_path)
+
+    return await asyncio.gather(*map(_one, image_paths), return_exceptions=True)
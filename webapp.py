@@ -0,0 +1,24 @@
+"""HTTP app mounted by the LangGraph server (langgraph.json "http.app") for its lifespan hooks."""
+
+import contextlib
+import sys
+
+from starlette.applications import Starlette
+
+from fashion_agent.config import file_logger
+from fashion_agent.tools.helpers import close_http_session
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    """Close process-wide clients on shutdown, on the same event loop that created them."""
+    yield
+    await close_http_session()
+    # The video stack is imported on first make_video only; don't load it just to close it
+    video_generation = sys.modules.get("fashion_agent.utils.video_generation")
+    if video_generation is not None:
+        await video_generation.close_genai_client()
+    file_logger.info("Closed shared HTTP and GenAI clients")
+
+
+app = Starlette(lifespan=lifespan)